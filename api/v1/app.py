@@ -18,6 +18,14 @@ CORS(app, resources={r"/*": {"origins": "0.0.0.0"}})
 app.register_blueprint(app_views)
 
 
+@app.before_request
+def refresh():
+    """
+    catches up with the writes of other worker processes
+    """
+    storage.refresh()
+
+
 @app.teardown_appcontext
 def teardown(exception):
     """
@@ -0,0 +1,4 @@
+#!/usr/bin/python3
+"""
+api/v1 served by an ASGI server, on the asyncio storage engine
+"""
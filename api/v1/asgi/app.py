@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+"""
+app served by an ASGI server, e.g. hypercorn api.v1.asgi.app:app
+"""
+
+from quart import Quart, jsonify
+from quart_cors import cors
+from os import getenv
+
+from api.v1.asgi.views import app_views, storage
+
+
+app = Quart(__name__)
+
+app = cors(app, allow_origin="0.0.0.0")
+
+app.register_blueprint(app_views)
+
+
+@app.before_serving
+async def setup():
+    """
+    creates the tables and the sessions of the storage
+    """
+    await storage.reload()
+
+
+@app.after_serving
+async def shutdown():
+    """
+    closes the connections of the storage
+    """
+    await storage.dispose()
+
+
+@app.teardown_appcontext
+async def teardown(exception):
+    """
+    teardown function
+    """
+    await storage.close()
+
+
+@app.errorhandler(404)
+async def handle_404(exception):
+    """
+    handles 404 error
+    :return: returns 404 json
+    """
+    data = {
+        "error": "Not found"
+    }
+
+    resp = jsonify(data)
+    resp.status_code = 404
+
+    return resp
+
+if __name__ == "__main__":
+    app.run(getenv("HBNB_API_HOST"), getenv("HBNB_API_PORT"))
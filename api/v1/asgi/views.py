@@ -0,0 +1,526 @@
+#!/usr/bin/python3
+"""
+routes of api/v1 served from coroutines, on the asyncio storage engine
+"""
+from datetime import datetime
+from os import getenv
+
+from quart import Blueprint, abort, jsonify, request
+from sqlalchemy import inspect
+
+from api.v1.parsing import check_json, page_args, page_headers
+from api.v1.parsing import update_attrs
+from models.amenity import Amenity
+from models.city import City
+from models.engine.async_db_storage import AsyncDBStorage
+from models.engine.async_db_storage import AsyncSQLiteStorage
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+
+if getenv("HBNB_TYPE_STORAGE") == "sqlite":
+    storage = AsyncSQLiteStorage()
+else:
+    storage = AsyncDBStorage()
+
+app_views = Blueprint('/api/v1', __name__, url_prefix="/api/v1")
+
+
+async def fetch(cls, id, load=None):
+    """
+    gets an object, or aborts with 404
+    :param cls: class name
+    :param id: id of the object
+    :param load: names of relationships to load with the object
+    :return: object
+    """
+    fetched_obj = await storage.get(cls, str(id), load=load)
+    if fetched_obj is None:
+        abort(404)
+    return fetched_obj
+
+
+async def request_json(*required):
+    """
+    reads the JSON body of the request, or aborts with 400
+    :param required: names of the keys the body must have
+    :return: dictionary
+    """
+    return check_json(await request.get_json(silent=True), *required)
+
+
+async def save(obj):
+    """
+    saves obj as BaseModel.save() does, in the asyncio storage
+    :param obj: new or changed object
+    """
+    obj.updated_at = datetime.now()
+    storage.new(obj)
+    await storage.save()
+
+
+async def create(obj):
+    """
+    saves a new object
+    :param obj: new object
+    :return: response with json of obj and 201
+    """
+    await save(obj)
+    resp = jsonify(obj.to_json())
+    resp.status_code = 201
+
+    return resp
+
+
+async def update(cls, id, ignored):
+    """
+    updates an object with the JSON body of the request
+    :param cls: class name
+    :param id: id of the object
+    :param ignored: keys of the body that cannot be updated
+    :return: response with json of the object
+    """
+    obj_json = await request_json()
+    fetched_obj = await fetch(cls, id)
+    update_attrs(fetched_obj, obj_json, ignored)
+    # the changes are read here, as BaseModel.changes() goes through
+    # models.storage, which is not the storage of these routes
+    if any(attr.history.has_changes()
+           for attr in inspect(fetched_obj).attrs):
+        await save(fetched_obj)
+
+    return jsonify(fetched_obj.to_json())
+
+
+async def delete(cls, id):
+    """
+    deletes an object
+    :param cls: class name
+    :param id: id of the object
+    :return: response with an empty json dictionary
+    """
+    fetched_obj = await fetch(cls, id)
+    await storage.delete(fetched_obj)
+    await storage.save()
+
+    return jsonify({})
+
+
+async def paginate(cls, where=None, order_by='id'):
+    """
+    lists a page of objects, see api.v1.views.paging.paginate()
+    :param cls: class name of the objects
+    :param where: dictionary of attribute name -> value that the objects
+    must match, or None for all objects of cls
+    :param order_by: attribute to sort by, then by id
+    :return: response with json of the objects of the page
+    """
+    limit, after_id = page_args(request.args)
+    try:
+        objs, after_id = await storage.page(cls, after_id, limit, order_by,
+                                            where)
+    except ValueError:
+        abort(400, 'Invalid cursor')
+    resp = jsonify([obj.to_json() for obj in objs])
+    resp.headers.update(page_headers(request.base_url, limit, after_id))
+
+    return resp
+
+
+@app_views.route("/status", methods=['GET'], strict_slashes=False)
+async def status():
+    """
+    status route
+    :return: response with json
+    """
+    return jsonify({"status": "OK"})
+
+
+@app_views.route("/stats", methods=['GET'], strict_slashes=False)
+async def stats():
+    """
+    stats of all objs route
+    :return: json of all objs
+    """
+    counts = await storage.counts()
+    return jsonify({
+        "amenities": counts["Amenity"],
+        "cities": counts["City"],
+        "places": counts["Place"],
+        "reviews": counts["Review"],
+        "states": counts["State"],
+        "users": counts["User"],
+    })
+
+
+@app_views.route("/states", methods=["GET"], strict_slashes=False)
+async def state_get_all():
+    """
+    retrieves a page of State objects
+    :return: json of the states of the page
+    """
+    return await paginate("State")
+
+
+@app_views.route("/states", methods=["POST"], strict_slashes=False)
+async def state_create():
+    """
+    create state route
+    :return: newly created state obj
+    """
+    return await create(State(**await request_json("name")))
+
+
+@app_views.route("/states/<state_id>", methods=["GET"], strict_slashes=False)
+async def state_by_id(state_id):
+    """
+    gets a specific State object by ID
+    :param state_id: state object id
+    :return: state obj with the specified id or error
+    """
+    return jsonify((await fetch("State", state_id)).to_json())
+
+
+@app_views.route("/states/<state_id>", methods=["PUT"], strict_slashes=False)
+async def state_put(state_id):
+    """
+    updates specific State object by ID
+    :param state_id: state object ID
+    :return: state object and 200 on success, or 400 or 404 on failure
+    """
+    return await update("State", state_id, [])
+
+
+@app_views.route("/states/<state_id>", methods=["DELETE"],
+                 strict_slashes=False)
+async def state_delete_by_id(state_id):
+    """
+    deletes State by id
+    :param state_id: state object id
+    :return: empty dict with 200 or 404 if not found
+    """
+    return await delete("State", state_id)
+
+
+@app_views.route("/states/<state_id>/cities", methods=["GET"],
+                 strict_slashes=False)
+async def city_by_state(state_id):
+    """
+    Retrieves a page of the City objects in a specific state, by name.
+    :param state_id: ID of the state
+    :return: JSON list of the cities of the page or 404 if state not found
+    """
+    state_obj = await fetch("State", state_id)
+    return await paginate("City", {"state_id": state_obj.id}, "name")
+
+
+@app_views.route("/states/<state_id>/cities", methods=["POST"],
+                 strict_slashes=False)
+async def city_create(state_id):
+    """
+    Creates a new City object in a state.
+    :param state_id: ID of the state
+    :return: JSON of the newly created City object, or appropriate error code
+    """
+    city_json = await request_json("name")
+    city_json["state_id"] = (await fetch("State", state_id)).id
+    return await create(City(**city_json))
+
+
+@app_views.route("/cities/<city_id>", methods=["GET"], strict_slashes=False)
+async def city_by_id(city_id):
+    """
+    Retrieves a specific City object by ID.
+    :param city_id: ID of the city
+    :return: JSON of the City object or 404 if not found
+    """
+    return jsonify((await fetch("City", city_id)).to_json())
+
+
+@app_views.route("/cities/<city_id>", methods=["PUT"], strict_slashes=False)
+async def city_put(city_id):
+    """
+    Updates a specific City object by ID.
+    :param city_id: ID of the city
+    :return: JSON of the updated City object, or appropriate error code
+    """
+    return await update("City", city_id, ["state_id"])
+
+
+@app_views.route("/cities/<city_id>", methods=["DELETE"],
+                 strict_slashes=False)
+async def city_delete_by_id(city_id):
+    """
+    Deletes a specific City object by ID.
+    :param city_id: ID of the city
+    :return: Empty dictionary with status 200, or 404 if city not found
+    """
+    return await delete("City", city_id)
+
+
+@app_views.route("/amenities", methods=["GET"], strict_slashes=False)
+async def amenity_get_all():
+    """
+    Retrieves a page of Amenity objects.
+    :return: JSON list of the amenities of the page
+    """
+    return await paginate("Amenity")
+
+
+@app_views.route("/amenities", methods=["POST"], strict_slashes=False)
+async def amenity_create():
+    """
+    Creates a new Amenity object.
+    :return: JSON of the newly created amenity object, or an error code
+    """
+    return await create(Amenity(**await request_json("name")))
+
+
+@app_views.route("/amenities/<amenity_id>", methods=["GET"],
+                 strict_slashes=False)
+async def amenity_by_id(amenity_id):
+    """
+    Retrieves a specific Amenity object by ID.
+    :param amenity_id: ID of the amenity
+    :return: JSON of the amenity object or 404 if not found
+    """
+    return jsonify((await fetch("Amenity", amenity_id)).to_json())
+
+
+@app_views.route("/amenities/<amenity_id>", methods=["PUT"],
+                 strict_slashes=False)
+async def amenity_put(amenity_id):
+    """
+    Updates a specific Amenity object by ID.
+    :param amenity_id: ID of the amenity
+    :return: JSON of the updated amenity object, or appropriate error code
+    """
+    return await update("Amenity", amenity_id, [])
+
+
+@app_views.route("/amenities/<amenity_id>", methods=["DELETE"],
+                 strict_slashes=False)
+async def amenity_delete_by_id(amenity_id):
+    """
+    Deletes a specific Amenity object by ID.
+    :param amenity_id: ID of the amenity
+    :return: Empty dictionary with status 200, or 404 if amenity not found
+    """
+    return await delete("Amenity", amenity_id)
+
+
+@app_views.route("/users", methods=["GET"], strict_slashes=False)
+async def user_get_all():
+    """
+    Retrieves a page of User objects.
+    :return: JSON list of the users of the page
+    """
+    return await paginate("User")
+
+
+@app_views.route("/users", methods=["POST"], strict_slashes=False)
+async def user_create():
+    """
+    Creates a new User object.
+    :return: JSON of the newly created user object, or appropriate error code
+    """
+    return await create(User(**await request_json("email", "password")))
+
+
+@app_views.route("/users/<user_id>", methods=["GET"], strict_slashes=False)
+async def user_by_id(user_id):
+    """
+    Retrieves a specific User object by ID.
+    :param user_id: ID of the user
+    :return: JSON of the user object or 404 if not found
+    """
+    return jsonify((await fetch("User", user_id)).to_json())
+
+
+@app_views.route("/users/<user_id>", methods=["PUT"], strict_slashes=False)
+async def user_put(user_id):
+    """
+    Updates a specific User object by ID.
+    :param user_id: ID of the user
+    :return: JSON of the updated user object, or appropriate error code
+    """
+    return await update("User", user_id, ["email"])
+
+
+@app_views.route("/users/<user_id>", methods=["DELETE"], strict_slashes=False)
+async def user_delete_by_id(user_id):
+    """
+    Deletes a specific User object by ID.
+    :param user_id: ID of the user
+    :return: Empty dictionary with status 200, or 404 if user not found
+    """
+    return await delete("User", user_id)
+
+
+@app_views.route("/cities/<city_id>/places", methods=["GET"],
+                 strict_slashes=False)
+async def places_by_city(city_id):
+    """
+    Retrieves a page of the Place objects of a city.
+    :param city_id: ID of the city
+    :return: JSON list of the Places of the page in the city
+    """
+    city_obj = await fetch("City", city_id)
+    return await paginate("Place", {"city_id": city_obj.id})
+
+
+@app_views.route("/cities/<city_id>/places", methods=["POST"],
+                 strict_slashes=False)
+async def place_create(city_id):
+    """
+    Creates a new Place object.
+    :param city_id: ID of the city
+    :return: JSON of the newly created Place object, or appropriate error code
+    """
+    place_json = await request_json("user_id", "name")
+    await fetch("User", place_json["user_id"])
+    place_json["city_id"] = (await fetch("City", city_id)).id
+    return await create(Place(**place_json))
+
+
+@app_views.route("/places/<place_id>", methods=["GET"], strict_slashes=False)
+async def place_by_id(place_id):
+    """
+    Retrieves a specific Place object by ID.
+    :param place_id: ID of the place
+    :return: JSON of the Place object or 404 if not found
+    """
+    return jsonify((await fetch("Place", place_id)).to_json())
+
+
+@app_views.route("/places/<place_id>", methods=["PUT"], strict_slashes=False)
+async def place_put(place_id):
+    """
+    Updates a specific Place object by ID.
+    :param place_id: ID of the place
+    :return: JSON of the updated Place object, or appropriate error code
+    """
+    return await update("Place", place_id, ["user_id", "city_id"])
+
+
+@app_views.route("/places/<place_id>", methods=["DELETE"],
+                 strict_slashes=False)
+async def place_delete_by_id(place_id):
+    """
+    Deletes a specific Place object by ID.
+    :param place_id: ID of the place
+    :return: Empty dictionary with status 200, or 404 if place not found
+    """
+    return await delete("Place", place_id)
+
+
+@app_views.route("/places/<place_id>/reviews", methods=["GET"],
+                 strict_slashes=False)
+async def reviews_by_place(place_id):
+    """
+    Retrieves a page of the Review objects of a place, oldest first.
+    :param place_id: ID of the place
+    :return: JSON list of the reviews of the page for the specified place
+    """
+    place_obj = await fetch("Place", place_id)
+    return await paginate("Review", {"place_id": place_obj.id}, "created_at")
+
+
+@app_views.route("/places/<place_id>/reviews", methods=["POST"],
+                 strict_slashes=False)
+async def review_create(place_id):
+    """
+    Creates a new Review object.
+    :param place_id: ID of the place
+    :return: JSON of the newly created Review object, or appropriate error code
+    """
+    review_json = await request_json("user_id", "text")
+    review_json["place_id"] = (await fetch("Place", place_id)).id
+    await fetch("User", review_json["user_id"])
+    return await create(Review(**review_json))
+
+
+@app_views.route("/reviews/<review_id>", methods=["GET"],
+                 strict_slashes=False)
+async def review_by_id(review_id):
+    """
+    Retrieves a specific Review object by ID.
+    :param review_id: ID of the review
+    :return: JSON of the Review object or 404 if not found
+    """
+    return jsonify((await fetch("Review", review_id)).to_json())
+
+
+@app_views.route("/reviews/<review_id>", methods=["PUT"],
+                 strict_slashes=False)
+async def review_put(review_id):
+    """
+    Updates a specific Review object by ID.
+    :param review_id: ID of the review
+    :return: JSON of the updated Review object, or appropriate error code
+    """
+    return await update("Review", review_id, ["user_id", "place_id"])
+
+
+@app_views.route("/reviews/<review_id>", methods=["DELETE"],
+                 strict_slashes=False)
+async def review_delete_by_id(review_id):
+    """
+    Deletes a specific Review object by ID.
+    :param review_id: ID of the review
+    :return: Empty dictionary with status 200, or 404 if review not found
+    """
+    return await delete("Review", review_id)
+
+
+@app_views.route("/places/<place_id>/amenities", methods=["GET"],
+                 strict_slashes=False)
+async def amenity_by_place(place_id):
+    """
+    Retrieves all amenities of a place.
+    :param place_id: ID of the place
+    :return: JSON list of all amenities for the specified place
+    """
+    fetched_obj = await fetch("Place", place_id, load=("amenities",))
+    return jsonify([obj.to_json() for obj in fetched_obj.amenities])
+
+
+@app_views.route("/places/<place_id>/amenities/<amenity_id>",
+                 methods=["DELETE"], strict_slashes=False)
+async def unlink_amenity_from_place(place_id, amenity_id):
+    """
+    Unlinks an amenity from a place.
+    :param place_id: ID of the place
+    :param amenity_id: ID of the amenity
+    :return: Empty JSON dictionary on success, or 404 on error
+    """
+    fetched_place = await fetch("Place", place_id, load=("amenities",))
+    fetched_amenity = await fetch("Amenity", amenity_id)
+    if fetched_amenity not in fetched_place.amenities:
+        abort(404)
+    fetched_place.amenities.remove(fetched_amenity)
+    await save(fetched_place)
+
+    return jsonify({})
+
+
+@app_views.route("/places/<place_id>/amenities/<amenity_id>",
+                 methods=["POST"], strict_slashes=False)
+async def link_amenity_to_place(place_id, amenity_id):
+    """
+    Links an amenity to a place.
+    :param place_id: ID of the place
+    :param amenity_id: ID of the amenity
+    :return: JSON of the linked Amenity object, or error
+    """
+    fetched_place = await fetch("Place", place_id, load=("amenities",))
+    fetched_amenity = await fetch("Amenity", amenity_id)
+    if fetched_amenity in fetched_place.amenities:
+        return jsonify(fetched_amenity.to_json())
+    fetched_place.amenities.append(fetched_amenity)
+    await save(fetched_place)
+    resp = jsonify(fetched_amenity.to_json())
+    resp.status_code = 201
+
+    return resp
@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+"""
+parsing of the requests of the routes, shared by the Flask app and the
+ASGI app: both frameworks abort through werkzeug
+"""
+from base64 import b64decode, urlsafe_b64encode
+from os import getenv
+from urllib.parse import urlencode
+
+from werkzeug.exceptions import abort
+
+PAGE_SIZE = int(getenv("HBNB_API_PAGE_SIZE", 100))
+"""PAGE_SIZE - number of objects of a page when limit is not given"""
+MAX_PAGE_SIZE = int(getenv("HBNB_API_MAX_PAGE_SIZE", 1000))
+"""MAX_PAGE_SIZE - largest number of objects of a page, a greater limit
+    is lowered to it"""
+READ_ONLY = ("id", "created_at", "updated_at")
+"""READ_ONLY - keys of a JSON body that never update an object"""
+
+
+def encode_cursor(after_id):
+    """
+    makes the opaque cursor of the page following an object
+    :param after_id: id of the last object of a page
+    :return: cursor text, safe in urls
+    """
+    return urlsafe_b64encode(after_id.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    reads a cursor made by encode_cursor()
+    :param cursor: cursor text
+    :return: id of the last object of the previous page
+    :raises ValueError: when cursor was not made by encode_cursor()
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return b64decode(padded.encode("ascii"), b"-_", validate=True).decode()
+
+
+def page_args(args):
+    """
+    reads the limit and cursor query parameters, or aborts with 400
+    :param args: query parameters of the request
+    :return: (number of objects of the page, id of the last object of the
+    previous page or None for the first page)
+    """
+    try:
+        limit = min(int(args.get("limit", PAGE_SIZE)), MAX_PAGE_SIZE)
+    except ValueError:
+        abort(400, 'Invalid limit')
+    if limit < 1:
+        abort(400, 'Invalid limit')
+    after_id = None
+    if args.get("cursor"):
+        try:
+            after_id = decode_cursor(args["cursor"])
+        except ValueError:
+            abort(400, 'Invalid cursor')
+    return limit, after_id
+
+
+def page_headers(base_url, limit, after_id):
+    """
+    headers giving the next page of a list
+    :param base_url: url of the request, without the query parameters
+    :param limit: number of objects of a page
+    :param after_id: id of the last object of the page, or None for the
+    last page
+    :return: dictionary of the Link and X-Next-Cursor headers, empty for
+    the last page
+    """
+    if after_id is None:
+        return {}
+    cursor = encode_cursor(after_id)
+    return {
+        "X-Next-Cursor": cursor,
+        "Link": '<{}?{}>; rel="next"'.format(
+            base_url, urlencode({"limit": limit, "cursor": cursor})),
+    }
+
+
+def check_json(obj_json, *required):
+    """
+    checks the JSON body of a request, or aborts with 400
+    :param obj_json: body read with silent=True, None when it is not JSON
+    :param required: names of the keys the body must have
+    :return: obj_json
+    """
+    if obj_json is None:
+        abort(400, 'Not a JSON')
+    for key in required:
+        if key not in obj_json:
+            abort(400, 'Missing {}'.format(key))
+    return obj_json
+
+
+def update_attrs(obj, obj_json, ignored=()):
+    """
+    sets the attributes of obj to the values of a JSON body that differ
+    :param obj: object to update
+    :param obj_json: dictionary of attribute name -> value
+    :param ignored: keys that cannot be updated, besides READ_ONLY
+    """
+    for key, val in obj_json.items():
+        if key not in READ_ONLY and key not in ignored:
+            if getattr(obj, key, None) != val:
+                setattr(obj, key, val)
@@ -4,20 +4,17 @@ Routes for handling Amenity objects and operations.
 """
 from flask import jsonify, abort, request
 from api.v1.views import app_views, storage
+from api.v1.parsing import check_json, update_attrs
+from api.v1.views.paging import paginate
 from models.amenity import Amenity
 
 @app_views.route("/amenities", methods=["GET"], strict_slashes=False)
 def amenity_get_all():
     """
-    Retrieves all Amenity objects.
-    :return: JSON list of all amenities
+    Retrieves a page of Amenity objects.
+    :return: JSON list of the amenities of the page
     """
-    am_list = []
-    am_obj = storage.all("Amenity")
-    for obj in am_obj.values():
-        am_list.append(obj.to_json())
-
-    return jsonify(am_list)
+    return paginate("Amenity")
 
 @app_views.route("/amenities", methods=["POST"], strict_slashes=False)
 def amenity_create():
@@ -25,11 +22,7 @@ def amenity_create():
     Creates a new Amenity object.
     :return: JSON of the newly created amenity object, or appropriate error code
     """
-    am_json = request.get_json(silent=True)
-    if am_json is None:
-        abort(400, 'Not a JSON')
-    if "name" not in am_json:
-        abort(400, 'Missing name')
+    am_json = check_json(request.get_json(silent=True), "name")
 
     new_am = Amenity(**am_json)
     new_am.save()
@@ -61,16 +54,13 @@ def amenity_put(amenity_id):
     :param amenity_id: ID of the amenity
     :return: JSON of the updated amenity object, or appropriate error code
     """
-    am_json = request.get_json(silent=True)
-    if am_json is None:
-        abort(400, 'Not a JSON')
+    am_json = check_json(request.get_json(silent=True))
     fetched_obj = storage.get("Amenity", str(amenity_id))
     if fetched_obj is None:
         abort(404)
-    for key, val in am_json.items():
-        if key not in ["id", "created_at", "updated_at"]:
-            setattr(fetched_obj, key, val)
-    fetched_obj.save()
+    update_attrs(fetched_obj, am_json)
+    if fetched_obj.changes() != set():
+        fetched_obj.save()
     return jsonify(fetched_obj.to_json())
 
 @app_views.route("/amenities/<amenity_id>", methods=["DELETE"],
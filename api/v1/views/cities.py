@@ -4,25 +4,24 @@ Routes for handling State objects and operations related to City objects.
 """
 from flask import jsonify, abort, request
 from api.v1.views import app_views, storage
+from api.v1.parsing import check_json, update_attrs
+from api.v1.views.paging import paginate
 from models.city import City
 
 @app_views.route("/states/<state_id>/cities", methods=["GET"],
                  strict_slashes=False)
 def city_by_state(state_id):
     """
-    Retrieves all City objects in a specific state.
+    Retrieves a page of the City objects in a specific state, by name.
     :param state_id: ID of the state
-    :return: JSON list of all cities in the state or 404 if state not found
+    :return: JSON list of the cities of the page or 404 if state not found
     """
-    city_list = []
     state_obj = storage.get("State", state_id)
 
     if state_obj is None:
         abort(404)
-    for obj in state_obj.cities:
-        city_list.append(obj.to_json())
 
-    return jsonify(city_list)
+    return paginate("City", {"state_id": state_obj.id}, "name")
 
 @app_views.route("/states/<state_id>/cities", methods=["POST"],
                  strict_slashes=False)
@@ -32,15 +31,12 @@ def city_create(state_id):
     :param state_id: ID of the state
     :return: JSON of the newly created city object, or appropriate error code
     """
-    city_json = request.get_json(silent=True)
-    if city_json is None:
-        abort(400, 'Not a JSON')
+    city_json = check_json(request.get_json(silent=True))
 
     if not storage.get("State", str(state_id)):
         abort(404)
 
-    if "name" not in city_json:
-        abort(400, 'Missing name')
+    check_json(city_json, "name")
 
     city_json["state_id"] = state_id
 
@@ -73,16 +69,13 @@ def city_put(city_id):
     :param city_id: ID of the city
     :return: JSON of the updated city object, or appropriate error code
     """
-    city_json = request.get_json(silent=True)
-    if city_json is None:
-        abort(400, 'Not a JSON')
+    city_json = check_json(request.get_json(silent=True))
     fetched_obj = storage.get("City", str(city_id))
     if fetched_obj is None:
         abort(404)
-    for key, val in city_json.items():
-        if key not in ["id", "created_at", "updated_at", "state_id"]:
-            setattr(fetched_obj, key, val)
-    fetched_obj.save()
+    update_attrs(fetched_obj, city_json, ["state_id"])
+    if fetched_obj.changes() != set():
+        fetched_obj.save()
     return jsonify(fetched_obj.to_json())
 
 @app_views.route("/cities/<city_id>", methods=["DELETE"],
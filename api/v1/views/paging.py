@@ -0,0 +1,31 @@
+#!/usr/bin/python3
+"""
+keyset pagination of the routes listing objects
+"""
+from flask import abort, jsonify, request
+
+from api.v1.parsing import page_args, page_headers
+from models import storage
+
+
+def paginate(cls, where=None, order_by='id'):
+    """
+    lists a page of objects, as selected by the limit and cursor query
+    parameters
+    :param cls: class name of the objects
+    :param where: dictionary of attribute name -> value that the objects
+    must match, or None for all objects of cls
+    :param order_by: attribute to sort by, then by id
+    :return: response with json of the objects of the page, with the
+    Link and X-Next-Cursor headers giving the next page unless it is the
+    last one
+    """
+    limit, after_id = page_args(request.args)
+    try:
+        objs, after_id = storage.page(cls, after_id, limit, order_by, where)
+    except ValueError:
+        abort(400, 'Invalid cursor')
+    resp = jsonify([obj.to_json() for obj in objs])
+    resp.headers.update(page_headers(request.base_url, limit, after_id))
+
+    return resp
@@ -4,24 +4,23 @@ Routes for handling Place objects and operations.
 """
 from flask import jsonify, abort, request
 from api.v1.views import app_views, storage
+from api.v1.parsing import check_json, update_attrs
+from api.v1.views.paging import paginate
 from models.place import Place
 
 @app_views.route("/cities/<city_id>/places", methods=["GET"],
                  strict_slashes=False)
 def places_by_city(city_id):
     """
-    Retrieves all Place objects by city.
+    Retrieves a page of the Place objects of a city.
     :param city_id: ID of the city
-    :return: JSON list of all Places in the city
+    :return: JSON list of the Places of the page in the city
     """
-    place_list = []
     city_obj = storage.get("City", str(city_id))
     if city_obj is None:
         abort(404)
-    for obj in city_obj.places:
-        place_list.append(obj.to_json())
 
-    return jsonify(place_list)
+    return paginate("Place", {"city_id": city_obj.id})
 
 @app_views.route("/cities/<city_id>/places", methods=["POST"],
                  strict_slashes=False)
@@ -31,13 +30,7 @@ def place_create(city_id):
     :param city_id: ID of the city
     :return: JSON of the newly created Place object, or appropriate error code
     """
-    place_json = request.get_json(silent=True)
-    if place_json is None:
-        abort(400, 'Not a JSON')
-    if "user_id" not in place_json:
-        abort(400, 'Missing user_id')
-    if "name" not in place_json:
-        abort(400, 'Missing name')
+    place_json = check_json(request.get_json(silent=True), "user_id", "name")
     if not storage.get("User", place_json["user_id"]):
         abort(404)
     if not storage.get("City", city_id):
@@ -75,21 +68,17 @@ def place_put(place_id):
     :param place_id: ID of the place
     :return: JSON of the updated Place object, or appropriate error code
     """
-    place_json = request.get_json(silent=True)
-
-    if place_json is None:
-        abort(400, 'Not a JSON')
+    place_json = check_json(request.get_json(silent=True))
 
     fetched_obj = storage.get("Place", str(place_id))
 
     if fetched_obj is None:
         abort(404)
 
-    for key, val in place_json.items():
-        if key not in ["id", "created_at", "updated_at", "user_id", "city_id"]:
-            setattr(fetched_obj, key, val)
+    update_attrs(fetched_obj, place_json, ["user_id", "city_id"])
 
-    fetched_obj.save()
+    if fetched_obj.changes() != set():
+        fetched_obj.save()
 
     return jsonify(fetched_obj.to_json())
 
@@ -3,9 +3,9 @@
 Route for handling place and amenities linking.
 """
 from flask import jsonify, abort
-from os import getenv
 
 from api.v1.views import app_views, storage
+from models import storage_t
 
 
 @app_views.route("/places/<place_id>/amenities",
@@ -43,14 +43,15 @@ def unlink_amenity_from_place(place_id, amenity_id):
     if fetched_place is None or fetched_amenity is None:
         abort(404)
 
-    if getenv("HBNB_TYPE_STORAGE") == "db":
+    if storage_t == "db":
         if fetched_amenity in fetched_place.amenities:
             fetched_place.amenities.remove(fetched_amenity)
         else:
             abort(404)
     else:
         if amenity_id in fetched_place.amenity_ids:
-            fetched_place.amenity_ids.remove(amenity_id)
+            fetched_place.amenity_ids = [id for id in fetched_place.amenity_ids
+                                         if id != amenity_id]
         else:
             abort(404)
 
@@ -78,7 +79,7 @@ def link_amenity_to_place(place_id, amenity_id):
     if fetched_amenity in fetched_place.amenities:
         return jsonify(fetched_amenity.to_json())
 
-    if getenv("HBNB_TYPE_STORAGE") == "db":
+    if storage_t == "db":
         fetched_place.amenities.append(fetched_amenity)
     else:
         fetched_place.amenities = fetched_amenity
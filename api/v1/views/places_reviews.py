@@ -4,26 +4,24 @@ Routes for handling Review objects and operations.
 """
 from flask import jsonify, abort, request
 from api.v1.views import app_views, storage
+from api.v1.parsing import check_json, update_attrs
+from api.v1.views.paging import paginate
 from models.review import Review
 
 @app_views.route("/places/<place_id>/reviews", methods=["GET"],
                  strict_slashes=False)
 def reviews_by_place(place_id):
     """
-    Retrieves all Review objects by place.
+    Retrieves a page of the Review objects of a place, oldest first.
     :param place_id: ID of the place
-    :return: JSON list of all reviews for the specified place
+    :return: JSON list of the reviews of the page for the specified place
     """
-    review_list = []
     place_obj = storage.get("Place", str(place_id))
 
     if place_obj is None:
         abort(404)
 
-    for obj in place_obj.reviews:
-        review_list.append(obj.to_json())
-
-    return jsonify(review_list)
+    return paginate("Review", {"place_id": place_obj.id}, "created_at")
 
 @app_views.route("/places/<place_id>/reviews", methods=["POST"],
                  strict_slashes=False)
@@ -33,13 +31,7 @@ def review_create(place_id):
     :param place_id: ID of the place
     :return: JSON of the newly created Review object, or appropriate error code
     """
-    review_json = request.get_json(silent=True)
-    if review_json is None:
-        abort(400, 'Not a JSON')
-    if "user_id" not in review_json:
-        abort(400, 'Missing user_id')
-    if "text" not in review_json:
-        abort(400, 'Missing text')
+    review_json = check_json(request.get_json(silent=True), "user_id", "text")
     if not storage.get("Place", place_id):
         abort(404)
     if not storage.get("User", review_json["user_id"]):
@@ -77,21 +69,17 @@ def review_put(review_id):
     :param review_id: ID of the review
     :return: JSON of the updated Review object, or appropriate error code
     """
-    review_json = request.get_json(silent=True)
-
-    if review_json is None:
-        abort(400, 'Not a JSON')
+    review_json = check_json(request.get_json(silent=True))
 
     fetched_obj = storage.get("Review", str(review_id))
 
     if fetched_obj is None:
         abort(404)
 
-    for key, val in review_json.items():
-        if key not in ["id", "created_at", "updated_at", "user_id", "place_id"]:
-            setattr(fetched_obj, key, val)
+    update_attrs(fetched_obj, review_json, ["user_id", "place_id"])
 
-    fetched_obj.save()
+    if fetched_obj.changes() != set():
+        fetched_obj.save()
 
     return jsonify(fetched_obj.to_json())
 
@@ -4,21 +4,18 @@ route for the handling State objects and operations
 """
 from flask import jsonify, abort, request
 from api.v1.views import app_views, storage
+from api.v1.parsing import check_json, update_attrs
+from api.v1.views.paging import paginate
 from models.state import State
 
 
 @app_views.route("/states", methods=["GET"], strict_slashes=False)
 def state_get_all():
     """
-    retrieves all State objects
-    :return: json of all states
+    retrieves a page of State objects
+    :return: json of the states of the page
     """
-    state_list = []
-    state_obj = storage.all("State")
-    for obj in state_obj.values():
-        state_list.append(obj.to_json())
-
-    return jsonify(state_list)
+    return paginate("State")
 
 
 @app_views.route("/states", methods=["POST"], strict_slashes=False)
@@ -27,11 +24,7 @@ def state_create():
     create state route
     :return: newly created state obj
     """
-    state_json = request.get_json(silent=True)
-    if state_json is None:
-        abort(400, 'Not a JSON')
-    if "name" not in state_json:
-        abort(400, 'Missing name')
+    state_json = check_json(request.get_json(silent=True), "name")
 
     new_state = State(**state_json)
     new_state.save()
@@ -64,16 +57,13 @@ def state_put(state_id):
     :param state_id: state object ID
     :return: state object and 200 on success, or 400 or 404 on failure
     """
-    state_json = request.get_json(silent=True)
-    if state_json is None:
-        abort(400, 'Not a JSON')
+    state_json = check_json(request.get_json(silent=True))
     fetched_obj = storage.get("State", str(state_id))
     if fetched_obj is None:
         abort(404)
-    for key, val in state_json.items():
-        if key not in ["id", "created_at", "updated_at"]:
-            setattr(fetched_obj, key, val)
-    fetched_obj.save()
+    update_attrs(fetched_obj, state_json)
+    if fetched_obj.changes() != set():
+        fetched_obj.save()
     return jsonify(fetched_obj.to_json())
 
 
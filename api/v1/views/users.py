@@ -4,20 +4,17 @@ Routes for handling User objects and operations.
 """
 from flask import jsonify, abort, request
 from api.v1.views import app_views, storage
+from api.v1.parsing import check_json, update_attrs
+from api.v1.views.paging import paginate
 from models.user import User
 
 @app_views.route("/users", methods=["GET"], strict_slashes=False)
 def user_get_all():
     """
-    Retrieves all User objects.
-    :return: JSON list of all users
+    Retrieves a page of User objects.
+    :return: JSON list of the users of the page
     """
-    user_list = []
-    user_obj = storage.all("User")
-    for obj in user_obj.values():
-        user_list.append(obj.to_json())
-
-    return jsonify(user_list)
+    return paginate("User")
 
 @app_views.route("/users", methods=["POST"], strict_slashes=False)
 def user_create():
@@ -25,13 +22,7 @@ def user_create():
     Creates a new User object.
     :return: JSON of the newly created user object, or appropriate error code
     """
-    user_json = request.get_json(silent=True)
-    if user_json is None:
-        abort(400, 'Not a JSON')
-    if "email" not in user_json:
-        abort(400, 'Missing email')
-    if "password" not in user_json:
-        abort(400, 'Missing password')
+    user_json = check_json(request.get_json(silent=True), "email", "password")
 
     new_user = User(**user_json)
     new_user.save()
@@ -61,21 +52,17 @@ def user_put(user_id):
     :param user_id: ID of the user
     :return: JSON of the updated user object, or appropriate error code
     """
-    user_json = request.get_json(silent=True)
-
-    if user_json is None:
-        abort(400, 'Not a JSON')
+    user_json = check_json(request.get_json(silent=True))
 
     fetched_obj = storage.get("User", str(user_id))
 
     if fetched_obj is None:
         abort(404)
 
-    for key, val in user_json.items():
-        if key not in ["id", "created_at", "updated_at", "email"]:
-            setattr(fetched_obj, key, val)
+    update_attrs(fetched_obj, user_json, ["email"])
 
-    fetched_obj.save()
+    if fetched_obj.changes() != set():
+        fetched_obj.save()
 
     return jsonify(fetched_obj.to_json())
 
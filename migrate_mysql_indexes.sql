@@ -0,0 +1,47 @@
+-- adds the indexes of the models to the tables of an existing database
+-- usage: cat migrate_mysql_indexes.sql | mysql -uroot -p hbnb_dev_db
+-- running it again leaves the indexes as they are
+
+DROP PROCEDURE IF EXISTS hbnb_index;
+DELIMITER //
+CREATE PROCEDURE hbnb_index(tbl VARCHAR(64), idx VARCHAR(64),
+                            cols VARCHAR(255))
+BEGIN
+    -- creates index idx on tbl (cols) unless it exists, or drops it when
+    -- cols is NULL and it exists
+    DECLARE found INT;
+    SELECT COUNT(*) INTO found FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = tbl
+        AND index_name = idx;
+    IF found = 0 AND cols IS NOT NULL THEN
+        SET @ddl = CONCAT('CREATE INDEX ', idx, ' ON ', tbl, ' (', cols, ')');
+    ELSEIF found > 0 AND cols IS NULL THEN
+        SET @ddl = CONCAT('DROP INDEX ', idx, ' ON ', tbl);
+    ELSE
+        SET @ddl = NULL;
+    END IF;
+    IF @ddl IS NOT NULL THEN
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END //
+DELIMITER ;
+
+-- foreign keys
+CALL hbnb_index('places', 'ix_places_city_id', 'city_id');
+CALL hbnb_index('places', 'ix_places_user_id', 'user_id');
+CALL hbnb_index('reviews', 'ix_reviews_user_id', 'user_id');
+-- cities of a state by name
+CALL hbnb_index('cities', 'ix_cities_state_id_name', 'state_id, name, id');
+-- which also serves the foreign key: the index on state_id alone is only
+-- its prefix
+CALL hbnb_index('cities', 'ix_cities_state_id', NULL);
+-- reviews of a place by date, also used to look up reviews by place_id
+CALL hbnb_index('reviews', 'ix_reviews_place_id_created_at',
+                'place_id, created_at, id');
+CALL hbnb_index('reviews', 'ix_reviews_place_id', NULL);
+-- users by email
+CALL hbnb_index('users', 'ix_users_email', 'email');
+
+DROP PROCEDURE hbnb_index;
@@ -3,7 +3,6 @@
 BaseModel Class of Models Module
 """
 
-import os
 import json
 import models
 from uuid import uuid4
@@ -11,7 +10,7 @@ from datetime import datetime
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import Column, String, DateTime
 
-storage_type = os.environ.get('HBNB_TYPE_STORAGE')
+storage_type = models.storage_t
 
 """
 Creates instance of Base if storage type is a database.
@@ -43,6 +42,17 @@ class BaseModel:
             for key, value in kwargs.items():
                 setattr(self, key, value)
 
+    if storage_type != 'db':
+        def __setattr__(self, name, value):
+            """
+            Sets an attribute, and records the change in storage
+            :param name: Attribute name
+            :param value: Value to be set
+            """
+            old = self.__dict__.get(name)
+            super().__setattr__(name, value)
+            models.storage.track(self, name, old)
+
     def __is_serializable(self, obj_v):
         """
         Checks if an object is serializable
@@ -68,10 +78,19 @@ class BaseModel:
     def save(self):
         """
         Updates attribute `updated_at` to current time and saves the object
+        :return: what storage.save() returns
         """
         self.updated_at = datetime.now()
         models.storage.new(self)
-        models.storage.save()
+        return models.storage.save()
+
+    def changes(self):
+        """
+        Names of the attributes changed since the object was last written
+        :return: set of attribute names, or None when the object was never
+        written to storage
+        """
+        return models.storage.changes(self)
 
     def to_json(self):
         """
@@ -79,7 +98,7 @@ class BaseModel:
         :return: JSON dictionary of the object
         """
         bm_dict = {}
-        for key, value in self.__dict__.items():
+        for key, value in self.__dict__.copy().items():
             if self.__is_serializable(value):
                 bm_dict[key] = value
             else:
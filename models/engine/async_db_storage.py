@@ -0,0 +1,189 @@
+#!/usr/bin/python3
+""" Asyncio database engine """
+
+import asyncio
+import os
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_scoped_session
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from models.base_model import Base
+from models.engine.db_storage import DBStorage, counts_query
+from models.engine.db_storage import loader_options, page_query, split_page
+from models.engine.sqlite_storage import set_pragmas
+
+
+class AsyncDBStorage:
+    """handles long term storage of all class instances from coroutines,
+    with the same methods as DBStorage: the ones reading or writing the
+    database are coroutines, and relationships must be loaded with load=
+    as they cannot be loaded lazily"""
+    CNC = DBStorage.CNC
+
+    __engine = None
+    __session = None
+
+    def __init__(self):
+        """ creates the engine self.__engine """
+        self.__engine = self.new_engine()
+
+    def new_engine(self):
+        """
+        creates the engine of the database at HBNB_DB_ASYNC_URL, or else
+        of the MySQL database given by the HBNB_MYSQL_* variables
+        :return: SQLAlchemy AsyncEngine
+        """
+        url = os.environ.get('HBNB_DB_ASYNC_URL')
+        if not url:
+            url = 'mysql+aiomysql://{}:{}@{}/{}'.format(
+                os.environ.get('HBNB_MYSQL_USER'),
+                os.environ.get('HBNB_MYSQL_PWD'),
+                os.environ.get('HBNB_MYSQL_HOST'),
+                os.environ.get('HBNB_MYSQL_DB'))
+        return create_async_engine(url, **self.engine_options())
+
+    def engine_options(self):
+        """
+        reads the engine settings from the environment, see DBStorage
+        :return: dictionary of create_async_engine() keyword arguments
+        """
+        return DBStorage.engine_options(self)
+
+    async def all(self, cls=None, load=None, strategy='selectin'):
+        """ returns a dictionary of all objects """
+        # load names relationships of cls to read eagerly, see DBStorage
+        obj_dict = {}
+        if cls:
+            names = [cls.__name__ if isinstance(cls, type) else cls]
+        else:
+            names = [name for name in self.CNC if name != 'BaseModel']
+            load = None
+        for class_name in names:
+            result = await self.__session.scalars(
+                select(self.CNC.get(class_name)).options(
+                    *loader_options(self.CNC.get(class_name), load,
+                                    strategy)))
+            for item in result:
+                key = str(item.__class__.__name__) + "." + str(item.id)
+                obj_dict[key] = item
+        return obj_dict
+
+    def new(self, obj):
+        """ adds objects to current database session """
+        self.__session.add(obj)
+
+    async def get(self, cls, id, load=None, strategy='selectin'):
+        """
+        fetches specific object
+        :param cls: class of object as string
+        :param id: id of object as string
+        :param load: names of relationships to load eagerly, see DBStorage
+        :param strategy: 'selectin' or 'joined', see LOADERS
+        :return: found object or None
+        """
+        cls_name = cls.__name__ if isinstance(cls, type) else cls
+        return await self.__session.get(
+            self.CNC.get(cls_name), id,
+            options=loader_options(self.CNC.get(cls_name), load, strategy))
+
+    async def page(self, cls, after_id=None, limit=100, order_by='id',
+                   where=None):
+        """
+        gets the instances of a class one page at a time, see DBStorage
+        :param cls: class name
+        :param after_id: id of the last instance of the previous page, or
+        None for the first page
+        :param limit: maximum number of instances in the page
+        :param order_by: column to sort by, then by id; it must not be NULL
+        :param where: dictionary of column name -> value that the instances
+        must match, or None for all instances
+        :return: (list of instances, id to pass as after_id to get the
+        next page or None for the last page)
+        :raises ValueError: when after_id is not stored and order_by is
+        not id, as the position of the next page is then unknown
+        """
+        cls_name = cls.__name__ if isinstance(cls, type) else cls
+        after_value = None
+        if after_id is not None and order_by != 'id':
+            after = await self.get(cls_name, after_id)
+            if after is None:
+                raise ValueError("no {} with id {}".format(cls_name,
+                                                           after_id))
+            after_value = getattr(after, order_by)
+        objs = list(await self.__session.scalars(page_query(
+            self.CNC.get(cls_name), limit, order_by, where, after_id,
+            after_value)))
+        return split_page(objs, limit)
+
+    async def count(self, cls=None):
+        """
+        count of how many instances of a class
+        :param cls: class name
+        :return: count of instances of a class
+        """
+        counts = await self.counts()
+        if cls:
+            cls_name = cls.__name__ if isinstance(cls, type) else cls
+            return counts.get(cls_name, 0)
+        return sum(counts.values())
+
+    async def counts(self):
+        """
+        count of instances of every class, read in a single query
+        :return: dictionary of class name: number of instances
+        """
+        classes = {name: obj_class for name, obj_class in self.CNC.items()
+                   if name != 'BaseModel'}
+        row = (await self.__session.execute(counts_query(classes))).one()
+        return dict(zip(classes, row))
+
+    async def save(self):
+        """ commits all changes of current database session """
+        await self.__session.commit()
+
+    async def delete(self, obj=None):
+        """ deletes obj from current database session if not None """
+        if obj is not None:
+            await self.__session.delete(obj)
+
+    async def reload(self):
+        """ creates all tables in database & session from engine """
+        async with self.__engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        self.__session = async_scoped_session(
+            async_sessionmaker(
+                bind=self.__engine,
+                expire_on_commit=False),
+            scopefunc=asyncio.current_task)
+
+    async def close(self):
+        """
+            removes the session of the current task
+        """
+        await self.__session.remove()
+
+    async def dispose(self):
+        """
+            closes the connections of the engine, which must happen before
+            their event loop ends
+        """
+        await self.__engine.dispose()
+
+
+class AsyncSQLiteStorage(AsyncDBStorage):
+    """handles long term storage of all class instances in SQLite from
+    coroutines, through aiosqlite"""
+    __file_path = os.environ.get('HBNB_SQLITE_PATH', './dev/hbnb.db')
+    """__file_path - path of the SQLite database file"""
+
+    def new_engine(self):
+        """
+        creates the engine of the SQLite database file, see SQLiteStorage
+        :return: SQLAlchemy AsyncEngine
+        """
+        os.makedirs(os.path.dirname(AsyncSQLiteStorage.__file_path) or '.',
+                    exist_ok=True)
+        engine = create_async_engine(
+            'sqlite+aiosqlite:///{}'.format(AsyncSQLiteStorage.__file_path),
+            **self.engine_options())
+        event.listen(engine.sync_engine, 'connect', set_pragmas)
+        return engine
@@ -2,11 +2,118 @@
 """ Database engine """
 
 import os
-from sqlalchemy import create_engine, MetaData
+from datetime import datetime
+from sqlalchemy import and_, create_engine, event, func, inspect, insert
+from sqlalchemy import MetaData, or_, select, update
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm import make_transient_to_detached
 from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.exc import StaleDataError
 from models.base_model import Base
+from models.engine.lru_cache import LRUCache
 from models import base_model, amenity, city, place, review, state, user
 
+ENGINE_OPTIONS = (
+    ('HBNB_DB_POOL_SIZE', 'pool_size', int),
+    ('HBNB_DB_MAX_OVERFLOW', 'max_overflow', int),
+    ('HBNB_DB_POOL_TIMEOUT', 'pool_timeout', float),
+    ('HBNB_DB_POOL_RECYCLE', 'pool_recycle', int),
+    ('HBNB_DB_POOL_PRE_PING', 'pool_pre_ping', '1'.__eq__),
+    ('HBNB_DB_ISOLATION_LEVEL', 'isolation_level', str),
+)
+"""ENGINE_OPTIONS - (environment variable, create_engine() keyword, parser)
+    for the engine settings that can be tuned; unset variables keep the
+    SQLAlchemy defaults (a pool of 5 connections plus 10 overflow)"""
+LOADERS = {
+    'joined': joinedload,
+    'selectin': selectinload,
+}
+"""LOADERS - eager loading strategies of all() and get(): joined loads a
+    relationship in the same query with a JOIN, selectin with one more
+    query per relationship, WHERE <foreign key> IN (<parent ids>)"""
+
+
+def loader_options(obj_class, load, strategy='selectin'):
+    """
+    builds the loader options of a query of DBStorage or AsyncDBStorage
+    :param obj_class: queried class
+    :param load: names of relationships, dotted for nested ones
+    :param strategy: key of LOADERS
+    :return: list of loader options
+    """
+    loader = LOADERS[strategy]
+    options = []
+    for path in load or ():
+        option = None
+        rel_class = obj_class
+        for name in path.split('.'):
+            attr = getattr(rel_class, name)
+            if option is None:
+                option = loader(attr)
+            else:
+                option = getattr(option, loader.__name__)(attr)
+            rel_class = attr.property.mapper.class_
+        options.append(option)
+    return options
+
+
+def page_query(obj_class, limit, order_by='id', where=None, after_id=None,
+               after_value=None):
+    """
+    builds the query of a page of DBStorage.page() or AsyncDBStorage.page(),
+    which an index on (order_by, id) answers without a sort
+    :param obj_class: queried class
+    :param limit: maximum number of instances in the page; the query reads
+    one more to tell whether a page follows, see split_page()
+    :param order_by: column to sort by, then by id
+    :param where: dictionary of column name -> value that the instances
+    must match, or None for all instances
+    :param after_id: id of the last instance of the previous page, or None
+    for the first page
+    :param after_value: order_by value of that instance, unused when
+    order_by is id
+    :return: select of the instances
+    """
+    query = select(obj_class).filter_by(**(where or {}))
+    if order_by == 'id':
+        if after_id is not None:
+            query = query.where(obj_class.id > after_id)
+        query = query.order_by(obj_class.id)
+    else:
+        column = getattr(obj_class, order_by)
+        if after_id is not None:
+            query = query.where(or_(
+                column > after_value,
+                and_(column == after_value, obj_class.id > after_id)))
+        query = query.order_by(column, obj_class.id)
+    return query.limit(limit + 1)
+
+
+def split_page(objs, limit):
+    """
+    splits the instances read by a page_query() into the page and the
+    cursor of the next one
+    :param objs: list of instances
+    :param limit: limit given to page_query()
+    :return: (list of instances, id of the last one or None for the last
+    page)
+    """
+    if len(objs) > limit:
+        return objs[:limit], objs[limit - 1].id
+    return objs, None
+
+
+def counts_query(classes):
+    """
+    builds the query counting the instances of several classes at once
+    :param classes: dictionary of class name -> class
+    :return: select of a single row with a column per class name
+    """
+    return select(*[
+        select(func.count()).select_from(obj_class)
+        .scalar_subquery().label(name) for name, obj_class in classes.items()])
+
 
 class DBStorage:
     """handles long term storage of all class instances"""
@@ -23,23 +130,76 @@ class DBStorage:
     """ handles storage for database """
     __engine = None
     __session = None
+    __counts = None
+    """__counts - number of rows of every mapped class, or None until read;
+    kept current by __count_flush and dropped when a session rolls back or
+    is closed, so that the rows written by other processes get counted"""
+    __cache_size = int(os.environ.get('HBNB_DB_CACHE_SIZE', 0))
+    """__cache_size - number of objects kept by the cache of get(), 0 to
+    disable it"""
+    __cache_ttl = float(os.environ.get('HBNB_DB_CACHE_TTL', 60))
+    """__cache_ttl - seconds an object stays in the cache of get(), which
+    bounds how long writes of other processes can go unnoticed"""
+    __cache = None
+    """__cache - LRUCache of (class name, id) -> column values of the
+    objects read by get(), dropped when they are flushed or deleted"""
 
     def __init__(self):
         """ creates the engine self.__engine """
-        self.__engine = create_engine(
-            'mysql+mysqldb://{}:{}@{}/{}'.format(
+        self.__engine = self.new_engine()
+        if os.environ.get("HBNB_ENV") == 'test':
+            Base.metadata.drop_all(self.__engine)
+
+    def new_engine(self):
+        """
+        creates the engine of the database at HBNB_DB_URL, or else of the
+        MySQL database given by the HBNB_MYSQL_* variables
+        :return: SQLAlchemy engine
+        """
+        url = os.environ.get('HBNB_DB_URL')
+        if not url:
+            url = 'mysql+mysqldb://{}:{}@{}/{}'.format(
                 os.environ.get('HBNB_MYSQL_USER'),
                 os.environ.get('HBNB_MYSQL_PWD'),
                 os.environ.get('HBNB_MYSQL_HOST'),
-                os.environ.get('HBNB_MYSQL_DB')))
-        if os.environ.get("HBNB_ENV") == 'test':
-            Base.metadata.drop_all(self.__engine)
+                os.environ.get('HBNB_MYSQL_DB'))
+        return create_engine(url, **self.engine_options())
 
-    def all(self, cls=None):
+    def engine_options(self):
+        """
+        reads the engine settings from the environment
+        :return: dictionary of create_engine() keyword arguments
+        """
+        options = {}
+        for variable, keyword, parse in ENGINE_OPTIONS:
+            value = os.environ.get(variable)
+            if value:
+                options[keyword] = parse(value)
+        return options
+
+    def pool_stats(self):
+        """
+        statistics of the connection pool
+        :return: dictionary with the pool size, the connections idle in
+        the pool (checkedin), in use (checkedout) and beyond the pool
+        size (overflow) when the pool keeps them, and its status text
+        """
+        pool = self.__engine.pool
+        stats = {'status': pool.status()}
+        for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+            if hasattr(pool, name):
+                stats[name] = getattr(pool, name)()
+        return stats
+
+    def all(self, cls=None, load=None, strategy='selectin'):
         """ returns a dictionary of all objects """
+        # load names relationships of cls to read eagerly with strategy,
+        # see LOADERS, dotted to go through several: ("places.reviews",)
         obj_dict = {}
         if cls:
-            obj_class = self.__session.query(self.CNC.get(cls)).all()
+            cls_name = cls.__name__ if isinstance(cls, type) else cls
+            obj_class = self.__session.query(self.CNC.get(cls_name)).options(
+                *loader_options(self.CNC.get(cls_name), load, strategy)).all()
             for item in obj_class:
                 key = str(item.__class__.__name__) + "." + str(item.id)
                 obj_dict[key] = item
@@ -54,32 +214,274 @@ class DBStorage:
                 obj_dict[key] = item
         return obj_dict
 
+    def iter_all(self, cls=None, batch_size=1000):
+        """
+        iterates over all objects, reading them from a server-side cursor
+        batch_size rows at a time instead of loading them all at once;
+        the session should not run other queries until the iteration ends
+        :param cls: class name, to iterate only over its instances
+        :param batch_size: number of rows fetched and objects built at once
+        :return: iterator of objects
+        """
+        if cls:
+            cls_name = cls.__name__ if isinstance(cls, type) else cls
+            names = [cls_name]
+        else:
+            names = [name for name in self.CNC if name != 'BaseModel']
+        for class_name in names:
+            yield from self.__session.query(
+                self.CNC.get(class_name)).yield_per(batch_size)
+
     def new(self, obj):
         """ adds objects to current database session """
         self.__session.add(obj)
 
-    def get(self, cls, id):
+    def get(self, cls, id, load=None, strategy='selectin'):
         """
         fetches specific object
         :param cls: class of object as string
         :param id: id of object as string
+        :param load: names of relationships to load eagerly, see the
+        comment in all()
+        :param strategy: 'selectin' or 'joined', see LOADERS
         :return: found object or None
         """
-        obj_class = self.__session.query(self.CNC.get(cls)).get(id)
+        cls_name = cls.__name__ if isinstance(cls, type) else cls
+        if self.__cache is not None:
+            obj = self.__cached(cls_name, id)
+            if obj is not None:
+                return obj
+        obj_class = self.__session.get(
+            self.CNC.get(cls_name), id,
+            options=loader_options(self.CNC.get(cls_name), load, strategy))
+        if (self.__cache is not None and obj_class is not None and
+                not inspect(obj_class).modified):
+            self.__cache.put((cls_name, id), {
+                attr.key: attr.loaded_value
+                for attr in inspect(obj_class).attrs
+                if attr.key in obj_class.__table__.columns})
         return obj_class
 
+    def __cached(self, cls_name, id):
+        """
+        reads an object from the session, or else from the cache of get()
+        :param cls_name: class name
+        :param id: id of the object
+        :return: object attached to the session, or None when it is not
+        cached
+        """
+        obj_class = self.CNC.get(cls_name)
+        obj = self.__session.identity_map.get(
+            self.__session.identity_key(obj_class, id))
+        if obj is not None:
+            return obj
+        values = self.__cache.get((cls_name, id))
+        if values is None:
+            return None
+        obj = inspect(obj_class).class_manager.new_instance()
+        for name, value in values.items():
+            set_committed_value(obj, name, value)
+        make_transient_to_detached(obj)
+        self.__session.add(obj)
+        return obj
+
+    def cache_stats(self):
+        """
+        statistics of the cache of get()
+        :return: dictionary with the numbers of hits, misses and cached
+        objects, and the maximum number of cached objects, or None when
+        the cache is disabled
+        """
+        if self.__cache is None:
+            return None
+        return self.__cache.stats()
+
+    def page(self, cls, after_id=None, limit=100, order_by='id',
+             where=None):
+        """
+        gets the instances of a class one page at a time, with a query
+        that an index on (order_by, id) answers without a sort
+        :param cls: class name
+        :param after_id: id of the last instance of the previous page, or
+        None for the first page
+        :param limit: maximum number of instances in the page
+        :param order_by: column to sort by, then by id; it must not be NULL
+        :param where: dictionary of column name -> value that the instances
+        must match, or None for all instances
+        :return: (list of instances, id to pass as after_id to get the
+        next page or None for the last page)
+        :raises ValueError: when after_id is not stored and order_by is
+        not id, as the position of the next page is then unknown
+        """
+        cls_name = cls.__name__ if isinstance(cls, type) else cls
+        after_value = None
+        if after_id is not None and order_by != 'id':
+            after = self.get(cls_name, after_id)
+            if after is None:
+                raise ValueError("no {} with id {}".format(cls_name,
+                                                           after_id))
+            after_value = getattr(after, order_by)
+        objs = self.__session.scalars(page_query(
+            self.CNC.get(cls_name), limit, order_by, where, after_id,
+            after_value)).all()
+        return split_page(objs, limit)
+
+    def get_many(self, cls, ids):
+        """
+        fetches several objects of one class in a single query
+        :param cls: class of objects as string
+        :param ids: ids of objects as strings
+        :return: list of found objects or None, in the order of ids
+        """
+        ids = list(ids)
+        if not ids:
+            return []
+        cls_name = cls.__name__ if isinstance(cls, type) else cls
+        obj_class = self.CNC.get(cls_name)
+        found = {}
+        for item in self.__session.query(obj_class).filter(
+                obj_class.id.in_(ids)):
+            found[item.id] = item
+        return [found.get(id) for id in ids]
+
+    def changes(self, obj):
+        """
+        names of the attributes of obj changed since it was last flushed
+        :param obj: instance
+        :return: set of attribute names, or None when obj is not persistent
+        """
+        obj_state = inspect(obj)
+        if not obj_state.persistent:
+            return None
+        return {attr.key for attr in obj_state.attrs
+                if attr.history.has_changes()}
+
     def count(self, cls=None):
         """
         count of how many instances of a class
         :param cls: class name
         :return: count of instances of a class
         """
+        counts = self.counts()
         if cls:
-            return self.__session.query(self.CNC.get(cls)).count()
-        count = 0
-        for class_name in self.CNC:
-            count += self.__session.query(self.CNC.get(class_name)).count()
-        return count
+            cls_name = cls.__name__ if isinstance(cls, type) else cls
+            return counts.get(cls_name, 0)
+        return sum(counts.values())
+
+    def counts(self):
+        """
+        count of instances of every class, read in a single query the
+        first time and then kept current as sessions flush new and deleted
+        objects, cascades included
+        :return: dictionary of class name: number of instances
+        """
+        self.__session.flush()
+        if self.__counts is None:
+            classes = {name: obj_class for name, obj_class in self.CNC.items()
+                       if name != 'BaseModel'}
+            row = self.__session.execute(counts_query(classes)).one()
+            self.__counts = dict(zip(classes, row))
+        return dict(self.__counts)
+
+    def __count_flush(self, session, flush_context):
+        """
+        updates __counts with the objects inserted and deleted by a flush
+        :param session: flushed session
+        :param flush_context: state of the flush
+        """
+        counts = self.__counts
+        if counts is None:
+            return
+        for objs, step in ((session.new, 1), (session.deleted, -1)):
+            for obj in objs:
+                cls_name = type(obj).__name__
+                if cls_name in counts:
+                    counts[cls_name] += step
+
+    def __evict_flush(self, session, flush_context):
+        """
+        drops from the cache of get() the objects updated or deleted by a
+        flush
+        :param session: flushed session
+        :param flush_context: state of the flush
+        """
+        for obj in session.dirty | session.deleted:
+            self.__cache.pop((type(obj).__name__, obj.id))
+
+    def __evict_rollback(self, session, previous_transaction):
+        """
+        empties the cache of get(), which may hold rolled back values
+        :param session: session rolled back
+        :param previous_transaction: transaction rolled back
+        """
+        self.__cache.clear()
+
+    def __count_rollback(self, session, previous_transaction):
+        """
+        drops __counts, which may include the rolled back changes
+        :param session: session rolled back
+        :param previous_transaction: transaction rolled back
+        """
+        self.__counts = None
+
+    def bulk_new(self, objs):
+        """
+        inserts new objects with one multi-row INSERT per class and set
+        of attributes, then commits; the objects are then attached to the
+        session as if they had been added and flushed one by one
+        :param objs: iterable of new instances
+        """
+        classes = {}
+        for obj in objs:
+            classes.setdefault(type(obj), []).append(obj)
+        for obj_class, class_objs in classes.items():
+            columns = [attr.key for attr in inspect(obj_class).column_attrs]
+            self.__session.execute(insert(obj_class), [
+                {name: obj.__dict__[name] for name in columns
+                 if name in obj.__dict__} for obj in class_objs])
+            for obj in class_objs:
+                make_transient_to_detached(obj)
+            self.__session.add_all(class_objs)
+            if self.__counts is not None:
+                self.__counts[obj_class.__name__] += len(class_objs)
+        self.save()
+
+    def bulk_update(self, cls, rows):
+        """
+        updates stored objects with one UPDATE executed for all rows,
+        then commits; updated_at is set to now unless a row sets it
+        :param cls: class name
+        :param rows: iterable of dictionaries of attribute name -> value,
+        each with the id of the object to update
+        :return: number of updated objects
+        :raises ValueError: when a row names an object that is not stored,
+        in which case nothing is updated
+        """
+        cls_name = cls.__name__ if isinstance(cls, type) else cls
+        obj_class = self.CNC.get(cls_name)
+        now = datetime.now()
+        rows = [dict(row) for row in rows]
+        for row in rows:
+            row.setdefault('updated_at', now)
+        if not rows:
+            return 0
+        try:
+            self.__session.execute(update(obj_class), rows)
+        except StaleDataError as err:
+            self.__session.rollback()
+            raise ValueError("some {} rows are not stored".format(
+                cls_name)) from err
+        identity_map = self.__session.identity_map
+        for row in rows:
+            if self.__cache is not None:
+                self.__cache.pop((cls_name, row['id']))
+            obj = identity_map.get(self.__session.identity_key(
+                obj_class, row['id']))
+            if obj is not None:
+                for name, value in row.items():
+                    set_committed_value(obj, name, value)
+        self.save()
+        return len(rows)
 
     def save(self):
         """ commits all changes of current database session """
@@ -89,17 +491,38 @@ class DBStorage:
         """ deletes obj from current database session if not None """
         if obj is not None:
             self.__session.delete(obj)
+            if self.__cache is not None:
+                self.__cache.pop((type(obj).__name__, obj.id))
+
+    def delete_many(self, objs):
+        """ deletes several objs from current database session """
+        for obj in objs:
+            self.delete(obj)
 
     def reload(self):
         """ creates all tables in database & session from engine """
         Base.metadata.create_all(self.__engine)
-        self.__session = scoped_session(
-            sessionmaker(
-                bind=self.__engine,
-                expire_on_commit=False))
+        session_factory = sessionmaker(
+            bind=self.__engine,
+            expire_on_commit=False)
+        event.listen(session_factory, 'after_flush', self.__count_flush)
+        event.listen(session_factory, 'after_soft_rollback',
+                     self.__count_rollback)
+        self.__counts = None
+        if self.__cache_size:
+            self.__cache = LRUCache(self.__cache_size, self.__cache_ttl)
+            event.listen(session_factory, 'after_flush', self.__evict_flush)
+            event.listen(session_factory, 'after_soft_rollback',
+                         self.__evict_rollback)
+        self.__session = scoped_session(session_factory)
+
+    def refresh(self):
+        """ nothing to catch up with: every query reads the database """
+        pass
 
     def close(self):
         """
             calls remove() on private session attribute (self.session)
         """
         self.__session.remove()
+        self.__counts = None
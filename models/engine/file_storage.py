@@ -2,14 +2,45 @@
 """
 Handles I/O, writing and reading, of JSON for storage of all class instances
 """
+import atexit
+import bisect
+import gc
+import heapq
 import json
+import os
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from models import base_model, amenity, city, place, review, state, user
+from models.engine import snapshot
 from datetime import datetime
+from itertools import repeat
 
 strptime = datetime.strptime
+raw_decode = json.JSONDecoder().raw_decode
 to_json = base_model.BaseModel.to_json
 
 
+class Commit(threading.Event):
+    """durability point of the saves of a group commit: set once they are
+    written, or once their write failed"""
+    error = None
+    """error - exception raised by the write, None when it succeeded"""
+
+    def wait(self, timeout=None):
+        """
+        waits for the write of the saves
+        :param timeout: seconds to wait at most, None to wait until set
+        :return: True once written, False when the timeout elapsed
+        :raises Exception: the error of a failed write
+        """
+        done = super().wait(timeout)
+        if done and self.error is not None:
+            raise self.error
+        return done
+
+
 class FileStorage:
     """handles long term storage of all class instances"""
     CNC = {
@@ -25,39 +56,452 @@ class FileStorage:
     keys: Class Names
     values: Class type (used for instantiation)
     """
+    FKS = {
+        'City': ('state_id',),
+        'Place': ('city_id', 'user_id'),
+        'Review': ('place_id', 'user_id')
+    }
+    """FKS - foreign key attributes indexed by FileStorage:
+    keys: Class Names
+    values: tuple of attribute names
+    """
     __file_path = './dev/file.json'
     __objects = {}
+    __classes = {}
+    """__classes - partition of __objects by class:
+    keys: Class Names
+    values: dictionary of <class name>.id -> obj, for that class only
+    """
+    __related = {}
+    """__related - reverse indexes of the foreign keys in FKS, built on
+    first use by related():
+    keys: (Class Name, attribute name)
+    values: dictionary of attribute value -> {<class name>.id: obj}
+    """
+    __sorted = {}
+    """__sorted - <class name>.id of the instances of a class in sorted
+    order, built on first use by page():
+    keys: Class Names
+    values: sorted list of <class name>.id
+    """
+    __stamp = None
+    """__stamp - (inode, size, mtime) of the JSON file and of its journal
+    as last read or written by this process, None for a missing file
+    """
+    __pending = {}
+    """__pending - objects added, changed or deleted since the last save:
+    keys: <class name>.id
+    values: obj, or None when it was deleted
+    """
+    __changes = {}
+    """__changes - stored objects changed since they were last written:
+    keys: <class name>.id
+    values: set of changed attribute names, or None for an object that was
+    never written since it was added
+    """
+    __texts = {}
+    """__texts - JSON text of the objects as last written, or read in lazy
+    mode, dropped as soon as the object changes:
+    keys: <class name>.id
+    values: JSON text
+    """
+    __journal = os.environ.get('HBNB_FILE_JOURNAL') == '1'
+    """__journal - when True, save() appends the pending objects to
+    <snapshot file>.log instead of rewriting the snapshot file
+    """
+    __journal_ratio = float(os.environ.get('HBNB_FILE_JOURNAL_RATIO', 1))
+    __journal_size = int(os.environ.get('HBNB_FILE_JOURNAL_SIZE', 64 << 20))
+    """__journal_ratio, __journal_size - the journal is compacted into a
+    new JSON file once it is larger than __journal_ratio times the JSON
+    file or than __journal_size bytes
+    """
+    __format = os.environ.get('HBNB_FILE_FORMAT', 'json')
+    """__format - 'json', or 'binary' to keep the objects in the binary
+    format of models.engine.snapshot, in <__file_path without .json>.hbnb
+    """
+    __shards = int(os.environ.get('HBNB_FILE_SHARDS', 0))
+    """__shards - 0 to keep all objects in one snapshot file, or the number
+    of files per class, in the <__file_path without .json> directory:
+    <class name>.json, or <class name>.<n>.json when there is more than one
+    file per class and objects are spread over them by a hash of their id
+    """
+    __shared = os.environ.get('HBNB_FILE_SHARED') == '1'
+    """__shared - when True, several processes can use the same files:
+    writes hold an advisory lock on <__file_path without .json>.lock and
+    increment the generation counter in <__file_path without .json>.gen,
+    which refresh() compares to catch up with the writes of the others
+    """
+    __generation = 0
+    __offset = 0
+    """__generation, __offset - generation counter and journal size as of
+    the last read or write of this process
+    """
+    __lazy = os.environ.get('HBNB_FILE_LAZY') == '1'
+    """__lazy - when True, reload() keeps the JSON text of each object and
+    instantiates it on first access through all(), get(), get_many() or
+    related()
+    """
+    __commit_window = float(os.environ.get('HBNB_FILE_COMMIT_WINDOW', 0))
+    __commit_batch = int(os.environ.get('HBNB_FILE_COMMIT_BATCH', 0))
+    """__commit_window, __commit_batch - group commit: when the window (in
+    milliseconds) is set, saves are written together once the window
+    elapsed or __commit_batch saves are waiting, whichever comes first
+    """
+    __threads = os.environ.get('HBNB_FILE_THREADS') == '1'
+    """__threads - when True, all() returns a copy of __objects, that other
+    threads can change while the caller iterates it
+    """
+    __lock = threading.RLock()
+    __write_lock = threading.Lock()
+    """__lock, __write_lock - __lock guards changes to __objects and its
+    indexes, and is only held for short steps; __write_lock lets one thread
+    at a time write the files, without holding __lock while it serializes
+    """
+    __serializing = object()
+    """__serializing - stands in __texts for the text being serialized, so
+    that a change meanwhile, which removes it, prevents caching that text
+    """
+    __commit = None
+    __commit_lock = threading.Lock()
+    __commit_timer = None
+    __commit_waiting = 0
+    """__commit - Commit set once the pending group commit is written or
+    failed, None when no save is waiting
+    """
 
-    def all(self, cls=None):
+    def all(self, cls=None, load=None, strategy='selectin'):
         """returns private attribute: __objects"""
+        # load and strategy name relationships that DBStorage loads
+        # eagerly; here relationships are read from the foreign key indexes
         if cls:
-            objects_dict = {}
-            for class_id, obj in FileStorage.__objects.items():
-                if type(obj).__name__ == cls:
-                    objects_dict[class_id] = obj
-            return objects_dict
+            cls_name = cls.__name__ if isinstance(cls, type) else cls
+            objs = FileStorage.__classes.get(cls_name, {})
+            if FileStorage.__lazy:
+                self.__hydrate_all(objs)
+            return dict(objs)
+        if FileStorage.__lazy:
+            self.__hydrate_all(FileStorage.__objects)
+        if FileStorage.__threads:
+            return dict(FileStorage.__objects)
         return FileStorage.__objects
 
+    def iter_all(self, cls=None, batch_size=1000):
+        """
+        iterates over the objects of __objects, building them one at a
+        time in lazy mode
+        :param cls: class, to iterate only over its instances
+        :param batch_size: accepted for compatibility with DBStorage
+        :return: iterator of objects
+        """
+        if cls:
+            cls_name = cls.__name__ if isinstance(cls, type) else cls
+            objs = FileStorage.__classes.get(cls_name, {})
+        else:
+            objs = FileStorage.__objects
+        for key, obj in list(objs.items()):
+            if type(obj) is str:
+                obj = self.__hydrate(key)
+            if obj is not None:
+                yield obj
+
+    def __add(self, key, obj):
+        """
+        stores obj under key in __objects and in its class partition
+        :param key: <obj class name>.id
+        :param obj: instance to store
+        """
+        previous = FileStorage.__objects.get(key)
+        if previous is not None:
+            self.__relate(key, previous, remove=True)
+        FileStorage.__changes.pop(key, None)
+        FileStorage.__texts.pop(key, None)
+        FileStorage.__objects[key] = obj
+        FileStorage.__classes.setdefault(key.split(".")[0], {})[key] = obj
+        self.__relate(key, obj)
+        keys = FileStorage.__sorted.get(key.split(".")[0])
+        if previous is None and keys is not None:
+            bisect.insort(keys, key)
+
+    def __discard(self, key):
+        """
+        removes key from __objects and from its class partition
+        :param key: <obj class name>.id
+        :return: removed object or None
+        """
+        obj = FileStorage.__objects.pop(key, None)
+        FileStorage.__changes.pop(key, None)
+        FileStorage.__texts.pop(key, None)
+        if obj is not None:
+            FileStorage.__classes[key.split(".")[0]].pop(key, None)
+            self.__relate(key, obj, remove=True)
+            keys = FileStorage.__sorted.get(key.split(".")[0])
+            if keys is not None:
+                del keys[bisect.bisect_left(keys, key)]
+        return obj
+
+    def __relate(self, key, obj, remove=False):
+        """
+        adds or removes key in the foreign key indexes built for obj
+        :param key: <obj class name>.id
+        :param obj: indexed instance, or its raw record in lazy mode
+        :param remove: True to remove key instead of adding it
+        """
+        cls_name = key.split(".")[0]
+        for attr in FileStorage.FKS.get(cls_name, ()):
+            index = FileStorage.__related.get((cls_name, attr))
+            if index is None:
+                continue
+            value = self.__value(obj, attr)
+            if remove:
+                entries = index.get(value, {})
+                entries.pop(key, None)
+                if not entries:
+                    index.pop(value, None)
+            else:
+                index.setdefault(value, {})[key] = obj
+
+    def __value(self, obj, name):
+        """
+        reads an attribute of an instance or of its raw record
+        :param obj: instance, or its raw JSON record in lazy mode
+        :param name: attribute name
+        :return: attribute value
+        """
+        if type(obj) is str:
+            return json.loads(obj).get(name, "")
+        return getattr(obj, name, None)
+
+    def __index(self, cls_name, name):
+        """
+        returns the foreign key index of name for cls_name, building it
+        from the class partition the first time it is needed
+        :param cls_name: class name
+        :param name: foreign key attribute name, as listed in FKS
+        :return: dictionary of attribute value -> {<class name>.id: obj}
+        """
+        index = FileStorage.__related.get((cls_name, name))
+        if index is not None:
+            return index
+        with FileStorage.__lock:
+            index = {}
+            for key, obj in FileStorage.__classes.get(cls_name, {}).items():
+                index.setdefault(self.__value(obj, name), {})[key] = obj
+            return FileStorage.__related.setdefault((cls_name, name), index)
+
+    def page(self, cls, after_id=None, limit=100, order_by='id',
+             where=None):
+        """
+        gets the instances of a class one page at a time
+        :param cls: class
+        :param after_id: id of the last instance of the previous page, or
+        None for the first page
+        :param limit: maximum number of instances in the page
+        :param order_by: attribute to sort by, then by id, see __sort_key()
+        :param where: dictionary of attribute name -> value that the
+        instances must match, or None for all instances
+        :return: (list of instances, id to pass as after_id to get the
+        next page or None for the last page)
+        :raises ValueError: when after_id is not stored and order_by is
+        not id, as the position of the next page is then unknown
+        """
+        cls_name = cls.__name__ if isinstance(cls, type) else cls
+        if order_by == 'id' and not where:
+            with FileStorage.__lock:
+                keys = FileStorage.__sorted.get(cls_name)
+                if keys is None:
+                    keys = sorted(FileStorage.__classes.get(cls_name, {}))
+                    FileStorage.__sorted[cls_name] = keys
+                start = 0
+                if after_id is not None:
+                    start = bisect.bisect_right(
+                        keys, "{}.{}".format(cls_name, after_id))
+                keys = keys[start:start + limit + 1]
+            objs = [obj for obj in map(self.get, repeat(cls_name),
+                                       [key.split(".", 1)[1] for key in keys])
+                    if obj is not None]
+        else:
+            if where:
+                (name, value), *rest = where.items()
+                # the foreign key indexes narrow down the instances
+                objs = [obj for obj in self.related(cls_name, name, value)
+                        if all(getattr(obj, attr, None) == val
+                               for attr, val in rest)]
+            else:
+                objs = self.all(cls_name).values()
+            if after_id is not None:
+                if order_by == 'id':
+                    position = ((2, after_id), after_id)
+                else:
+                    after = self.get(cls_name, after_id)
+                    if after is None:
+                        raise ValueError("no {} with id {}".format(
+                            cls_name, after_id))
+                    position = self.__sort_key(after, order_by)
+                objs = [obj for obj in objs
+                        if self.__sort_key(obj, order_by) > position]
+            objs = heapq.nsmallest(
+                limit + 1, objs,
+                key=lambda obj: self.__sort_key(obj, order_by))
+        if len(objs) > limit:
+            return objs[:limit], objs[limit - 1].id
+        return objs, None
+
+    def __sort_key(self, obj, order_by):
+        """
+        returns the position of an instance in the pages sorted by an
+        attribute, comparable whatever the types of its values, which PUT
+        requests can change: missing or None first, as NULL in SQL, then
+        numbers, texts, dates and other values by their repr()
+        :param obj: instance
+        :param order_by: attribute name
+        :return: ((type rank, value), id)
+        """
+        value = getattr(obj, order_by, None)
+        if value is None:
+            rank, value = 0, 0
+        elif isinstance(value, (int, float)):
+            rank = 1
+        elif isinstance(value, str):
+            rank = 2
+        elif isinstance(value, datetime):
+            rank = 3
+        else:
+            rank, value = 4, repr(value)
+        return (rank, value), obj.id
+
+    def track(self, obj, name, old):
+        """
+        records that an attribute of a stored object changed, so that the
+        next save() writes it, and moves the object in the foreign key
+        indexes
+        :param obj: instance whose attribute changed
+        :param name: attribute name
+        :param old: previous value of the attribute
+        """
+        cls_name = type(obj).__name__
+        key = "{}.{}".format(cls_name, obj.__dict__.get('id'))
+        if FileStorage.__objects.get(key) is not obj:
+            return
+        with FileStorage.__lock:
+            if FileStorage.__objects.get(key) is not obj:
+                return
+            FileStorage.__texts.pop(key, None)
+            changes = FileStorage.__changes.get(key, set())
+            if changes is not None:
+                changes.add(name)
+                FileStorage.__changes[key] = changes
+            # written by the next save(), even without a call to new()
+            FileStorage.__pending[key] = obj
+            index = FileStorage.__related.get((cls_name, name))
+            if index is None:
+                return
+            entries = index.get(old, {})
+            entries.pop(key, None)
+            if not entries:
+                index.pop(old, None)
+            index.setdefault(getattr(obj, name), {})[key] = obj
+
+    def changes(self, obj):
+        """
+        names of the attributes of obj changed since it was last written
+        :param obj: instance
+        :return: set of attribute names, or None when obj is not stored or
+        was never written
+        """
+        key = "{}.{}".format(type(obj).__name__, obj.id)
+        if FileStorage.__objects.get(key) is not obj:
+            return None
+        changes = FileStorage.__changes.get(key, set())
+        return None if changes is None else set(changes)
+
+    def related(self, cls, name, value):
+        """
+        objects of cls whose foreign key attribute name equals value
+        :param cls: class
+        :param name: foreign key attribute name, as listed in FKS
+        :param value: id of the referenced object
+        :return: list of objects
+        """
+        cls_name = cls.__name__ if isinstance(cls, type) else cls
+        if name not in FileStorage.FKS.get(cls_name, ()):
+            return [obj for obj in self.all(cls_name).values()
+                    if getattr(obj, name, None) == value]
+        objs = self.__index(cls_name, name).get(value, {})
+        if FileStorage.__lazy:
+            self.__hydrate_all(objs)
+        return list(objs.values())
+
+    def __hydrate(self, key):
+        """
+        replaces the raw record stored under key by its instance
+        :param key: <class name>.id
+        :return: instance, or None if key is not stored
+        """
+        obj = FileStorage.__objects.get(key)
+        if type(obj) is not str:
+            return obj
+        with FileStorage.__lock:
+            text = FileStorage.__objects.get(key)
+            if type(text) is not str:
+                return text
+            FileStorage.__texts[key] = text
+            obj = self.__build(json.loads(text))
+            FileStorage.__objects[key] = obj
+            cls_name = key.split(".")[0]
+            FileStorage.__classes[cls_name][key] = obj
+            for attr in FileStorage.FKS.get(cls_name, ()):
+                index = FileStorage.__related.get((cls_name, attr))
+                if index is not None:
+                    index[getattr(obj, attr, None)][key] = obj
+            return obj
+
+    def __hydrate_all(self, objs):
+        """
+        replaces the raw records in objs by their instances
+        :param objs: __objects, a class partition or a related index entry
+        """
+        with FileStorage.__lock:
+            keys = [key for key, obj in objs.items() if type(obj) is str]
+        for key in keys:
+            self.__hydrate(key)
+
     def new(self, obj):
         """sets / updates in __objects the obj with key <obj class name>.id"""
         bm_id = "{}.{}".format(type(obj).__name__, obj.id)
-        FileStorage.__objects[bm_id] = obj
+        with FileStorage.__lock:
+            if FileStorage.__objects.get(bm_id) is not obj:
+                self.__add(bm_id, obj)
+                FileStorage.__changes[bm_id] = None
+            FileStorage.__pending[bm_id] = obj
 
-    def get(self, cls, id):
+    def get(self, cls, id, load=None, strategy='selectin'):
         """
         gets specific object
         :param cls: class
         :param id: id of instance
+        :param load: ignored, see the comment in all()
+        :param strategy: ignored, see the comment in all()
         :return: object or None
         """
         cls_name = cls.__name__ if isinstance(cls, type) else cls
-        all_class = self.all(cls_name)
-
-        for obj in all_class.values():
-            if id == str(obj.id):
-                return obj
+        key = "{}.{}".format(cls_name, id)
+        if FileStorage.__lazy:
+            return self.__hydrate(key)
+        return FileStorage.__objects.get(key)
 
-        return None
+    def get_many(self, cls, ids):
+        """
+        gets several objects of one class
+        :param cls: class
+        :param ids: ids of instances
+        :return: list of objects or None, in the order of ids
+        """
+        cls_name = cls.__name__ if isinstance(cls, type) else cls
+        if FileStorage.__lazy:
+            get = self.__hydrate
+        else:
+            get = FileStorage.__objects.get
+        return [get("{}.{}".format(cls_name, id)) for id in ids]
 
     def count(self, cls=None):
         """
@@ -65,46 +509,692 @@ class FileStorage:
         :param cls: class
         :return: number of instances
         """
-        return len(self.all(cls))
+        if cls:
+            cls_name = cls.__name__ if isinstance(cls, type) else cls
+            return len(FileStorage.__classes.get(cls_name, {}))
+        return len(FileStorage.__objects)
+
+    def counts(self):
+        """
+        count of instances of every class, read from the partition of
+        __objects by class
+        :return: dictionary of class name: number of instances
+        """
+        return {cls_name: len(FileStorage.__classes.get(cls_name, {}))
+                for cls_name in FileStorage.CNC}
+
+    def bulk_new(self, objs):
+        """
+        adds new objects to __objects and writes them all at once
+        :param objs: iterable of new instances
+        :return: what save() returns
+        """
+        with FileStorage.__lock:
+            for obj in objs:
+                self.new(obj)
+        return self.save()
+
+    def bulk_update(self, cls, rows):
+        """
+        sets attributes of stored objects and writes them all at once;
+        updated_at is set to now unless a row sets it
+        :param cls: class
+        :param rows: iterable of dictionaries of attribute name -> value,
+        each with the id of the object to update
+        :return: number of updated objects
+        :raises ValueError: when a row names an object that is not stored,
+        in which case nothing is updated
+        """
+        cls_name = cls.__name__ if isinstance(cls, type) else cls
+        now = datetime.now()
+        with FileStorage.__lock:
+            rows = [(self.get(cls_name, row['id']), row) for row in rows]
+            for obj, row in rows:
+                if obj is None:
+                    raise ValueError("no {} with id {}".format(
+                        cls_name, row['id']))
+            for obj, row in rows:
+                for name, value in row.items():
+                    if name != 'id':
+                        setattr(obj, name, value)
+                if 'updated_at' not in row:
+                    obj.updated_at = now
+                self.new(obj)
+        self.save()
+        return len(rows)
 
     def save(self):
         """serializes __objects to the JSON file (path: __file_path)"""
-        fname = FileStorage.__file_path
-        d = {}
-        for bm_id, bm_obj in FileStorage.__objects.items():
-            d[bm_id] = bm_obj.to_json()
-        with open(fname, mode='w+', encoding='utf-8') as f_io:
-            json.dump(d, f_io)
+        if not FileStorage.__commit_window:
+            self.__persist()
+            commit = Commit()
+            commit.set()
+            return commit
+        with FileStorage.__commit_lock:
+            if FileStorage.__commit is None:
+                FileStorage.__commit = Commit()
+                FileStorage.__commit_timer = threading.Timer(
+                    FileStorage.__commit_window / 1000, self.flush)
+                FileStorage.__commit_timer.daemon = True
+                FileStorage.__commit_timer.start()
+            commit = FileStorage.__commit
+            FileStorage.__commit_waiting += 1
+            full = (0 < FileStorage.__commit_batch <=
+                    FileStorage.__commit_waiting)
+        if full:
+            self.flush()
+        return commit
+
+    def flush(self):
+        """
+        writes the saves waiting for a group commit and releases them; when
+        the write fails, their Commit holds the error, and the next save()
+        starts a new group commit with the objects left pending
+        """
+        with FileStorage.__commit_lock:
+            if FileStorage.__commit_timer is not None:
+                FileStorage.__commit_timer.cancel()
+                FileStorage.__commit_timer = None
+            commit = FileStorage.__commit
+            if commit is None:
+                return
+            try:
+                self.__persist()
+            except Exception as error:
+                commit.error = error
+                raise
+            finally:
+                FileStorage.__commit = None
+                FileStorage.__commit_waiting = 0
+                commit.set()
+
+    def __persist(self):
+        """writes the JSON file, or appends to its journal"""
+        with FileStorage.__write_lock, self.__locked(exclusive=True):
+            with FileStorage.__lock:
+                if FileStorage.__shared:
+                    self.__catch_up(FileStorage.__pending)
+                pending = FileStorage.__pending
+                FileStorage.__pending = {}
+                changes = {key: FileStorage.__changes.pop(key, set())
+                           for key in pending}
+            try:
+                self.__write_pending(pending, changes)
+            except BaseException:
+                with FileStorage.__lock:
+                    self.__restore(pending, changes)
+                raise
+
+    def __restore(self, pending, changes):
+        """
+        puts back the pending objects and changes of a failed write, under
+        those recorded since
+        :param pending: dictionary of <class name>.id -> obj or None
+        :param changes: dictionary of <class name>.id -> set of changed
+        attribute names, or None
+        """
+        pending.update(FileStorage.__pending)
+        FileStorage.__pending = pending
+        for key, names in changes.items():
+            if key not in FileStorage.__objects:
+                continue
+            since = FileStorage.__changes.get(key, set())
+            if names is None or since is None:
+                FileStorage.__changes[key] = None
+            else:
+                FileStorage.__changes[key] = names | since
+
+    def __write_pending(self, pending, changes):
+        """
+        writes the pending objects, then signals it to other processes in
+        shared mode
+        :param pending: dictionary of <class name>.id -> obj or None
+        :param changes: dictionary of <class name>.id -> set of changed
+        attribute names, or None
+        """
+        if FileStorage.__shards:
+            self.__write_shards(pending)
+        elif FileStorage.__journal and os.path.exists(
+                self.__snapshot_path()):
+            self.__append(pending, changes)
+        else:
+            self.__snapshot()
+        if FileStorage.__shared:
+            generation = FileStorage.__generation + 1
+            with open(self.__generation_path() + '.tmp', mode='w') as f_io:
+                f_io.write(str(generation))
+            os.replace(self.__generation_path() + '.tmp',
+                       self.__generation_path())
+            FileStorage.__generation = generation
+        FileStorage.__stamp = self.__file_stamp()
+
+    @contextmanager
+    def __locked(self, exclusive=False):
+        """
+        holds the advisory lock shared by all processes in shared mode
+        :param exclusive: True to write, False to read
+        """
+        if not FileStorage.__shared:
+            yield
+            return
+        import fcntl
+        try:
+            f_io = open(self.__base_path() + '.lock', mode='a')
+        except FileNotFoundError:
+            if exclusive:
+                raise
+            # no directory, hence nothing to read
+            yield
+            return
+        with f_io:
+            fcntl.flock(f_io, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f_io, fcntl.LOCK_UN)
+
+    def __read_generation(self):
+        """returns the generation counter written by the last process"""
+        try:
+            with open(self.__generation_path(), mode='r') as f_io:
+                return int(f_io.read())
+        except FileNotFoundError:
+            return 0
+
+    def refresh(self):
+        """
+        catches up with the writes of other processes in shared mode
+        """
+        if not FileStorage.__shared:
+            return
+        if self.__read_generation() == FileStorage.__generation:
+            return
+        with self.__locked(), FileStorage.__lock:
+            self.__catch_up(FileStorage.__pending)
+
+    def __catch_up(self, pending):
+        """
+        applies the writes of other processes since the last read or write
+        of this one: only the new journal records when the snapshot file
+        did not change, only the changed shard files, or everything
+        otherwise; the pending objects of this process then take over
+        :param pending: dictionary of <class name>.id -> obj or None
+        """
+        generation = self.__read_generation()
+        if generation == FileStorage.__generation:
+            return
+        stamp = self.__file_stamp()
+        old = FileStorage.__stamp
+        if FileStorage.__shards and os.path.isdir(self.__shard_dir()):
+            self.__read_shards(set(old or ()) ^ set(stamp or ()))
+        elif (not FileStorage.__shards and old is not None and
+              old[0] == stamp[0] and stamp[1] is not None and
+              (old[1] is None or old[1][0] == stamp[1][0])):
+            self.__replay(FileStorage.__offset if old[1] else 0)
+        else:
+            self.__read_all()
+        for key, obj in pending.items():
+            if obj is None:
+                self.__discard(key)
+            elif FileStorage.__objects.get(key) is not obj:
+                self.__add(key, obj)
+                FileStorage.__changes[key] = None
+        FileStorage.__generation = generation
+        FileStorage.__stamp = self.__file_stamp()
+
+    def __read_shards(self, changed):
+        """
+        replaces the objects of the shards whose files changed
+        :param changed: (file name, inode, size, mtime) of the shard files
+        that changed, were added or were removed
+        """
+        ext = self.__shard_ext()
+        shards = {name[:-len(ext)] for name, *st in changed
+                  if name.endswith(ext)}
+        for cls_name in {shard.split(".")[0] for shard in shards}:
+            for key in list(FileStorage.__classes.get(cls_name, {})):
+                if self.__shard(key) in shards:
+                    self.__discard(key)
+        for shard in shards:
+            try:
+                for cls_name, keys, objs in self.__read(
+                        self.__shard_path(shard)):
+                    for key, obj in zip(keys, objs):
+                        self.__add(key, obj)
+            except FileNotFoundError:
+                pass
+
+    def __snapshot(self):
+        """writes all objects to the snapshot file and removes the journal"""
+        if FileStorage.__shards:
+            self.__write_shards(FileStorage.__objects)
+            return
+        with FileStorage.__lock:
+            objects = list(FileStorage.__objects.items())
+        self.__write(self.__snapshot_path(), objects)
+        try:
+            os.remove(self.__journal_path())
+        except FileNotFoundError:
+            pass
+
+    def __write(self, fname, objects):
+        """
+        writes objects to a snapshot file, replacing it atomically
+        :param fname: path of the snapshot file
+        :param objects: iterable of (<class name>.id, obj) pairs
+        """
+        if FileStorage.__format == 'binary':
+            with open(fname + '.tmp', mode='wb') as f_io:
+                snapshot.dump(((bm_id, self.__record(bm_id, bm_obj))
+                               for bm_id, bm_obj in objects), f_io)
+        else:
+            with open(fname + '.tmp', mode='w+', encoding='utf-8') as f_io:
+                snapshot.dump_json(((bm_id, self.__text(bm_id, bm_obj))
+                                    for bm_id, bm_obj in objects), f_io)
+        os.replace(fname + '.tmp', fname)
+
+    def __text(self, key, obj):
+        """
+        returns the JSON text of a stored object, serializing it only when
+        it changed since it was last written
+        :param key: <class name>.id
+        :param obj: instance, or its JSON text in lazy mode
+        :return: JSON text
+        """
+        text = FileStorage.__texts.get(key)
+        if type(text) is str:
+            return text
+        with FileStorage.__lock:
+            if FileStorage.__objects.get(key) is obj:
+                FileStorage.__texts[key] = FileStorage.__serializing
+        text = obj if type(obj) is str else json.dumps(obj.to_json())
+        with FileStorage.__lock:
+            if FileStorage.__texts.get(key) is FileStorage.__serializing:
+                FileStorage.__texts[key] = text
+        return text
+
+    def __record(self, key, obj):
+        """
+        returns the to_json() dictionary of a stored object, decoding its
+        JSON text when it did not change since it was last written
+        :param key: <class name>.id
+        :param obj: instance, or its JSON text in lazy mode
+        :return: dictionary
+        """
+        text = FileStorage.__texts.get(key)
+        if type(text) is str:
+            return json.loads(text)
+        if type(obj) is str:
+            return json.loads(obj)
+        return obj.to_json()
+
+    def __write_shards(self, pending):
+        """
+        rewrites the shard files holding the pending objects, and removes
+        those left empty; writes all shards when the directory is missing,
+        then removes the journal of the single snapshot file they replace
+        :param pending: dictionary of <class name>.id -> obj or None
+        """
+        shard_dir = self.__shard_dir()
+        migrating = not os.path.isdir(shard_dir)
+        if migrating:
+            os.makedirs(shard_dir)
+            pending = FileStorage.__objects
+        with FileStorage.__lock:
+            shards = {self.__shard(key): [] for key in pending}
+            for cls_name in {shard.split(".")[0] for shard in shards}:
+                for key, obj in FileStorage.__classes.get(cls_name,
+                                                          {}).items():
+                    objs = shards.get(self.__shard(key))
+                    if objs is not None:
+                        objs.append((key, obj))
+        for shard, objs in shards.items():
+            if objs:
+                self.__write(self.__shard_path(shard), objs)
+            else:
+                try:
+                    os.remove(self.__shard_path(shard))
+                except FileNotFoundError:
+                    pass
+        if migrating:
+            try:
+                os.remove(self.__journal_path())
+            except FileNotFoundError:
+                pass
+
+    def __shard(self, key):
+        """
+        returns the name of the shard holding key
+        :param key: <class name>.id
+        :return: <class name>, or <class name>.<n> with several shards
+        """
+        if FileStorage.__shards == 1:
+            return key.split(".")[0]
+        cls_name, bm_id = key.split(".", 1)
+        return "{}.{}".format(cls_name, zlib.crc32(bm_id.encode()) %
+                              FileStorage.__shards)
+
+    def __shard_dir(self):
+        """returns the path of the directory of the shard files"""
+        return self.__base_path()
+
+    def __shard_path(self, shard):
+        """
+        returns the path of a shard file in the current format
+        :param shard: shard name, as returned by __shard()
+        """
+        return os.path.join(self.__shard_dir(), shard + self.__shard_ext())
+
+    def __shard_ext(self):
+        """returns the extension of the shard files in the current format"""
+        return '.hbnb' if FileStorage.__format == 'binary' else '.json'
+
+    def __append(self, pending, changes):
+        """
+        appends the pending objects to the journal, one JSON line each,
+        and compacts the journal once it outgrows its thresholds: a whole
+        object when it was added, or only its changed attributes
+        :param pending: dictionary of <class name>.id -> obj or None
+        :param changes: dictionary of <class name>.id -> set of changed
+        attribute names, or None
+        """
+        lines = []
+        for bm_id, bm_obj in pending.items():
+            names = changes[bm_id]
+            if bm_obj is None:
+                record = {"key": bm_id, "obj": None}
+            elif names is None:
+                record = {"key": bm_id, "obj": bm_obj.to_json()}
+            elif names:
+                d = bm_obj.to_json()
+                record = {"key": bm_id,
+                          "set": {name: d[name] for name in names
+                                  if name in d}}
+            else:
+                continue
+            lines.append(json.dumps(record) + "\n")
+        with open(self.__journal_path(), mode='a', encoding='utf-8') as f_io:
+            f_io.write("".join(lines))
+            size = FileStorage.__offset = f_io.tell()
+        limit = FileStorage.__journal_ratio * os.path.getsize(
+            self.__snapshot_path())
+        if size > min(limit, FileStorage.__journal_size):
+            self.__snapshot()
+
+    def __base_path(self):
+        """returns __file_path without its .json extension"""
+        return os.path.splitext(FileStorage.__file_path)[0]
+
+    def __generation_path(self):
+        """returns the path of the generation counter of shared mode"""
+        return self.__base_path() + '.gen'
+
+    def __snapshot_path(self):
+        """returns the path of the snapshot file in the current format"""
+        if FileStorage.__format == 'binary':
+            return self.__base_path() + '.hbnb'
+        return FileStorage.__file_path
+
+    def __journal_path(self):
+        """returns the path of the journal of the snapshot file"""
+        return self.__snapshot_path() + '.log'
+
+    def __file_stamp(self):
+        """
+        identifies the current version of the snapshot file and its journal
+        :return: (inode, size, mtime) of each file, or None if it is missing
+        """
+        if FileStorage.__shards:
+            try:
+                return tuple(sorted(
+                    (entry.name, entry.inode(), st.st_size, st.st_mtime_ns)
+                    for entry in os.scandir(self.__shard_dir())
+                    if not entry.name.endswith('.tmp')
+                    for st in (entry.stat(),)))
+            except FileNotFoundError:
+                return None
+        stamp = []
+        for fname in (self.__snapshot_path(), self.__journal_path()):
+            try:
+                st = os.stat(fname)
+                stamp.append((st.st_ino, st.st_size, st.st_mtime_ns))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def __build(self, d):
+        """
+        instantiates an object from its JSON dictionary, without going
+        through __init__ and attribute setters: d is already complete
+        and its password, if any, already hashed
+        :param d: dictionary made by to_json()
+        :return: new instance
+        """
+        k_cls = d['__class__']
+        d.pop("__class__", None)
+        d["created_at"] = datetime.fromisoformat(d["created_at"])
+        d["updated_at"] = datetime.fromisoformat(d["updated_at"])
+        obj = FileStorage.CNC[k_cls].__new__(FileStorage.CNC[k_cls])
+        obj.__dict__.update(d)
+        return obj
 
     def reload(self):
         """if file exists, deserializes JSON file to __objects, else nothing"""
-        fname = FileStorage.__file_path
+        self.flush()
+        with self.__locked(), FileStorage.__lock:
+            FileStorage.__pending = {}
+            self.__read_all()
+
+    def __read_all(self):
+        """reads all objects from the files, replacing __objects"""
+        fname = self.__snapshot_path()
         FileStorage.__objects = {}
+        FileStorage.__classes = {}
+        FileStorage.__related = {}
+        FileStorage.__sorted = {}
+        FileStorage.__changes = {}
+        FileStorage.__texts = {}
+        FileStorage.__stamp = self.__file_stamp()
+        FileStorage.__generation = self.__read_generation()
+        sharded = FileStorage.__shards and os.path.isdir(self.__shard_dir())
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            if sharded:
+                ext = self.__shard_ext()
+                fnames = [entry.path
+                          for entry in os.scandir(self.__shard_dir())
+                          if entry.name.endswith(ext)]
+                with ThreadPoolExecutor() as pool:
+                    # each worker reads and decodes a whole shard
+                    for groups in pool.map(list, map(self.__read, fnames)):
+                        self.__merge(groups)
+            else:
+                self.__merge(self.__read(fname))
+        except FileNotFoundError:
+            pass
+        finally:
+            if collecting:
+                gc.enable()
+        if not sharded:
+            # the journal belongs to the single snapshot file
+            self.__replay()
+
+    def __read(self, fname):
+        """
+        instantiates the objects of a snapshot file, or keeps their JSON
+        text in lazy mode
+        :param fname: path of a snapshot file in the current format
+        :return: iterator of (class name, list of <class name>.id, list of
+        objects) with one item per class, or per set of attribute names in
+        the binary format
+        """
+        if FileStorage.__format == 'binary':
+            with open(fname, mode='rb') as f_io:
+                for cls_name, keys, attrs in snapshot.load(f_io):
+                    k_cls = FileStorage.CNC[cls_name]
+                    objs = list(map(object.__new__,
+                                    repeat(k_cls, len(keys))))
+                    for obj, d in zip(objs, attrs):
+                        object.__setattr__(obj, '__dict__', d)
+                    yield cls_name, keys, objs
+            return
+        groups = {}
+        with open(fname, mode='r', encoding='utf-8') as f_io:
+            for o_id, d in self.__records(f_io, FileStorage.__lazy):
+                if type(d) is dict:
+                    d = self.__build(d)
+                keys, objs = groups.setdefault(o_id.split(".")[0], ([], []))
+                keys.append(o_id)
+                objs.append(d)
+        for cls_name, (keys, objs) in groups.items():
+            yield cls_name, keys, objs
+
+    def __merge(self, groups):
+        """
+        adds freshly read objects to the empty __objects and __classes
+        :param groups: iterator of (class name, list of <class name>.id,
+        list of objects), as returned by __read()
+        """
+        for cls_name, keys, objs in groups:
+            FileStorage.__classes.setdefault(cls_name, {}).update(
+                zip(keys, objs))
+            FileStorage.__objects.update(zip(keys, objs))
+
+    def __records(self, f_io, raw=False):
+        """
+        reads the records of a JSON file line by line when it holds one
+        record per line, as written by save(), or with json.load()
+        otherwise, e.g. when it was indented
+        :param f_io: JSON file open for reading
+        :param raw: True to get the JSON text of one record per line
+        records instead of decoding it
+        :return: list of (<class name>.id, dictionary or text) pairs
+        """
+        if f_io.readline() == "{\n":
+            try:
+                return self.__lines(f_io, raw)
+            except ValueError:
+                pass
+        f_io.seek(0)
+        return list(json.load(f_io).items())
+
+    def __lines(self, f_io, raw=False):
+        """
+        reads the records of a JSON file written by save(), after its
+        first line
+        :param f_io: JSON file open for reading
+        :param raw: True to get the JSON text of the records instead of
+        decoding it
+        :return: list of (<class name>.id, dictionary or text) pairs
+        :raises ValueError: when a line does not hold a whole record
+        """
+        records = []
+        for line in f_io:
+            if line.startswith("}"):
+                break
+            key, end = raw_decode(line)
+            text = line[end + 2:].rstrip("\n")
+            if text.endswith(","):
+                text = text[:-1]
+            if raw:
+                if not (text.startswith("{") and text.endswith("}")):
+                    raise ValueError("not one record per line")
+                records.append((key, text))
+                continue
+            value, end = raw_decode(text)
+            if end != len(text):
+                raise ValueError("not one record per line")
+            records.append((key, value))
+        return records
+
+    def __replay(self, offset=0):
+        """
+        applies the records of the journal on top of __objects
+        :param offset: position of the first record to apply
+        """
+        FileStorage.__offset = offset
         try:
-            with open(fname, mode='r', encoding='utf-8') as f_io:
-                new_objs = json.load(f_io)
+            with open(self.__journal_path(), mode='rb') as f_io:
+                f_io.seek(offset)
+                for line in f_io:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # torn write at the end of the journal
+                        break
+                    FileStorage.__offset += len(line)
+                    if "set" in record:
+                        self.__patch(record["key"], record["set"])
+                    elif record["obj"] is None:
+                        self.__discard(record["key"])
+                    else:
+                        self.__add(record["key"], self.__build(record["obj"]))
         except FileNotFoundError:
+            pass
+
+    def __patch(self, key, values):
+        """
+        sets attributes of a stored object, as recorded in the journal
+        :param key: <class name>.id
+        :param values: dictionary of attribute name -> to_json() value
+        """
+        obj = FileStorage.__objects.get(key)
+        if obj is None:
             return
-        for o_id, d in new_objs.items():
-            k_cls = d['__class__']
-            d.pop("__class__", None)
-            d["created_at"] = datetime.strptime(d["created_at"],
-                                                "%Y-%m-%d %H:%M:%S.%f")
-            d["updated_at"] = datetime.strptime(d["updated_at"],
-                                                "%Y-%m-%d %H:%M:%S.%f")
-            FileStorage.__objects[o_id] = FileStorage.CNC[k_cls](**d)
+        if type(obj) is str:
+            d = json.loads(obj)
+            d.update(values)
+            self.__add(key, json.dumps(d))
+            return
+        for name in ("created_at", "updated_at"):
+            if name in values:
+                values[name] = datetime.fromisoformat(values[name])
+        # a new instance: obj may still be pending in this process
+        patched = type(obj).__new__(type(obj))
+        patched.__dict__.update(obj.__dict__)
+        patched.__dict__.update(values)
+        self.__add(key, patched)
 
     def delete(self, obj=None):
         """deletes obj"""
         if obj is None:
             return
-        for k in list(FileStorage.__objects.keys()):
-            if obj.id == k.split(".")[1] and k.split(".")[0] in str(obj):
-                FileStorage.__objects.pop(k, None)
-                self.save()
+        self.delete_many([obj])
+
+    def delete_many(self, objs):
+        """
+        deletes several objects, then saves once
+        :param objs: iterable of instances
+        """
+        deleted = False
+        with FileStorage.__lock:
+            for obj in objs:
+                key = "{}.{}".format(type(obj).__name__, obj.id)
+                if self.__discard(key) is not None:
+                    FileStorage.__pending[key] = None
+                    deleted = True
+        if deleted:
+            self.save()
 
     def close(self):
         """
             calls the reload() method for deserialization from JSON to objects
+            when the JSON file changed since this process last read or
+            wrote it
         """
-        self.reload()
+        if FileStorage.__shared:
+            self.refresh()
+            return
+        if not FileStorage.__write_lock.acquire(blocking=False):
+            # another thread is writing, and will update __stamp
+            return
+        try:
+            changed = self.__file_stamp() != FileStorage.__stamp
+        finally:
+            FileStorage.__write_lock.release()
+        if changed:
+            self.reload()
+
+
+atexit.register(FileStorage().flush)
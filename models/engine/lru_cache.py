@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+"""
+Least recently used cache with a time to live, used by DBStorage.get()
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """maps keys to values, keeping at most maxsize of them for ttl seconds"""
+
+    def __init__(self, maxsize, ttl):
+        """
+        creates an empty cache
+        :param maxsize: number of values kept, the least recently used
+        ones being evicted first
+        :param ttl: seconds after which a value expires
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.__values = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key):
+        """
+        reads the value of key
+        :param key: hashable key
+        :return: value, or None when key is missing or expired
+        """
+        with self.__lock:
+            entry = self.__values.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self.__values[key]
+                self.misses += 1
+                return None
+            self.__values.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        """
+        stores value under key, evicting the least recently used value
+        when the cache is full
+        :param key: hashable key
+        :param value: value, not None
+        """
+        with self.__lock:
+            self.__values[key] = (time.monotonic() + self.ttl, value)
+            self.__values.move_to_end(key)
+            while len(self.__values) > self.maxsize:
+                self.__values.popitem(last=False)
+
+    def pop(self, key):
+        """
+        removes key from the cache
+        :param key: hashable key
+        """
+        with self.__lock:
+            self.__values.pop(key, None)
+
+    def clear(self):
+        """removes all keys from the cache"""
+        with self.__lock:
+            self.__values.clear()
+
+    def stats(self):
+        """
+        statistics of the cache
+        :return: dictionary with the numbers of hits, misses and values,
+        and the maximum number of values
+        """
+        with self.__lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'size': len(self.__values), 'maxsize': self.maxsize}
@@ -0,0 +1,166 @@
+#!/usr/bin/python3
+"""
+Reads and writes the snapshot files of FileStorage, and converts them
+between the JSON and the binary format
+
+usage: python3 -m models.engine.snapshot <source> <destination>
+"""
+import json
+import pickle
+import struct
+import sys
+from datetime import datetime, timedelta
+from itertools import repeat
+
+MAGIC = b'HBNB'
+VERSION = 2
+PROTOCOL = 4
+"""Binary format, version 2:
+    MAGIC, VERSION as a big-endian unsigned short, then a pickle, protocol
+    PROTOCOL, of
+    {class name: [(fields, keys, created_at, updated_at, columns), ...]}
+    with one tuple per set of attribute names (fields) in the class.
+    Timestamps are integer microseconds since EPOCH and every string is
+    stored once, later occurrences referring to the first one.
+    The pickle holds only built-in containers and scalars, and Unpickler
+    refuses anything else. Version 1 used marshal, whose format can change
+    between Python versions, and is no longer read.
+"""
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+RESERVED = ('__class__', 'created_at', 'updated_at')
+
+
+class Unpickler(pickle.Unpickler):
+    """reads the pickle of a binary snapshot, refusing to import anything:
+    a malformed or crafted file then fails instead of running code"""
+
+    def find_class(self, module, name):
+        """
+        refuses the global module.name, which a snapshot never holds
+        :raises pickle.UnpicklingError: always
+        """
+        raise pickle.UnpicklingError("forbidden global in snapshot: "
+                                     "{}.{}".format(module, name))
+
+
+def dump_json(records, f_io):
+    """
+    writes records as a JSON object, one record per line
+    :param records: iterable of (<class name>.id, JSON text) pairs
+    :param f_io: file open for writing text
+    """
+    f_io.write("{")
+    separator = "\n"
+    for key, text in records:
+        f_io.write("{}{}: {}".format(separator, json.dumps(key), text))
+        separator = ",\n"
+    f_io.write("\n}\n")
+
+
+def micros(value):
+    """
+    converts a timestamp to integer microseconds since EPOCH
+    :param value: datetime, or its str() / isoformat() text
+    :return: int
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return (value - EPOCH) // MICROSECOND
+
+
+def dump(records, f_io):
+    """
+    writes records in the binary format
+    :param records: iterable of (<class name>.id, to_json() dictionary)
+    :param f_io: file open for writing bytes
+    """
+    strings = {}
+    classes = {}
+    for key, d in records:
+        fields = tuple(sorted(k for k in d if k not in RESERVED))
+        fields = strings.setdefault(fields, fields)
+        groups = classes.setdefault(d['__class__'], {})
+        if fields not in groups:
+            groups[fields] = ([], [], [], [[] for name in fields])
+        keys, created, updated, columns = groups[fields]
+        keys.append(key)
+        created.append(micros(d['created_at']))
+        updated.append(micros(d['updated_at']))
+        for column, name in zip(columns, fields):
+            value = d[name]
+            if type(value) is str:
+                value = strings.setdefault(value, value)
+            column.append(value)
+    payload = {}
+    for cls_name, groups in classes.items():
+        payload[cls_name] = [(fields,) + group
+                             for fields, group in groups.items()]
+    f_io.write(MAGIC + struct.pack('>H', VERSION))
+    pickle.dump(payload, f_io, PROTOCOL)
+
+
+def load(f_io):
+    """
+    reads a file in the binary format
+    :param f_io: file open for reading bytes
+    :return: iterator of (class name, list of <class name>.id, iterator of
+    attribute dictionaries) with one item per set of attribute names
+    :raises ValueError: when f_io is not a binary snapshot of VERSION, or
+    is corrupt
+    """
+    header = f_io.read(len(MAGIC) + 2)
+    if header[:len(MAGIC)] != MAGIC:
+        raise ValueError("not a binary snapshot: {}".format(
+            getattr(f_io, 'name', f_io)))
+    version = struct.unpack('>H', header[len(MAGIC):])[0]
+    if version != VERSION:
+        raise ValueError("unsupported snapshot version: {}".format(version))
+    try:
+        payload = Unpickler(f_io).load()
+    except (pickle.UnpicklingError, EOFError) as e:
+        raise ValueError("corrupt snapshot: {}".format(e))
+    if type(payload) is not dict:
+        raise ValueError("corrupt snapshot: {}".format(
+            getattr(f_io, 'name', f_io)))
+    for cls_name, groups in payload.items():
+        for fields, keys, created, updated, columns in groups:
+            created = map(EPOCH.__add__, map(MICROSECOND.__mul__, created))
+            updated = map(EPOCH.__add__, map(MICROSECOND.__mul__, updated))
+            names = ('created_at', 'updated_at') + fields
+            yield cls_name, keys, map(dict, map(
+                zip, repeat(names), zip(created, updated, *columns)))
+
+
+def main(argv):
+    """
+    converts a JSON snapshot to the binary format, or back
+    :param argv: [program, source, destination]
+    :return: exit status
+    """
+    if len(argv) != 3:
+        print(__doc__.strip().splitlines()[-1], file=sys.stderr)
+        return 2
+    with open(argv[1], mode='rb') as f_in:
+        binary = f_in.read(len(MAGIC)) == MAGIC
+    if binary:
+        records = []
+        with open(argv[1], mode='rb') as f_in:
+            for cls_name, keys, attrs in load(f_in):
+                for key, d in zip(keys, attrs):
+                    d['created_at'] = str(d['created_at'])
+                    d['updated_at'] = str(d['updated_at'])
+                    d['__class__'] = cls_name
+                    records.append((key, json.dumps(d)))
+        with open(argv[2], mode='w', encoding='utf-8') as f_out:
+            dump_json(records, f_out)
+    else:
+        with open(argv[1], mode='r', encoding='utf-8') as f_in:
+            records = json.load(f_in)
+        with open(argv[2], mode='wb') as f_out:
+            dump(records.items(), f_out)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,40 @@
+#!/usr/bin/python3
+""" SQLite database engine """
+
+import os
+from sqlalchemy import create_engine, event
+from models.engine.db_storage import DBStorage
+
+
+def set_pragmas(dbapi_connection, connection_record):
+    """
+    configures each new SQLite connection: write-ahead logging, so that
+    readers do not block the writer, and enforced foreign keys
+    :param dbapi_connection: sqlite3 connection
+    :param connection_record: pool record of the connection
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+class SQLiteStorage(DBStorage):
+    """handles long term storage of all class instances in SQLite"""
+    __file_path = os.environ.get('HBNB_SQLITE_PATH', './dev/hbnb.db')
+    """__file_path - path of the SQLite database file"""
+
+    def new_engine(self):
+        """
+        creates the engine of the SQLite database file
+        :return: SQLAlchemy engine
+        """
+        os.makedirs(os.path.dirname(SQLiteStorage.__file_path) or '.',
+                    exist_ok=True)
+        engine = create_engine(
+            'sqlite:///{}'.format(SQLiteStorage.__file_path),
+            connect_args={'check_same_thread': False},
+            **self.engine_options())
+        event.listen(engine, 'connect', set_pragmas)
+        return engine
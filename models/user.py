@@ -2,21 +2,21 @@
 """
 User Class from Models Module
 """
-import os
+import models
 from models.base_model import BaseModel, Base
 from sqlalchemy.orm import relationship
 from sqlalchemy import Column, String
 from hashlib import md5
 
 # Determine storage type from environment variable
-storage_type = os.environ.get('HBNB_TYPE_STORAGE')
+storage_type = models.storage_t
 
 class User(BaseModel, Base):
     """User class handles all application users"""
     
     if storage_type == "db":
         __tablename__ = 'users'
-        email = Column(String(128), nullable=False)
+        email = Column(String(128), nullable=False, index=True)
         password = Column("password", String(128), nullable=False)
         first_name = Column(String(128), nullable=True)
         last_name = Column(String(128), nullable=True)
@@ -51,3 +51,20 @@ class User(BaseModel, Base):
         :return: nothing
         """
         self.__dict__["password"] = md5(password.encode('utf-8')).hexdigest()
+
+    if storage_type != "db":
+        @property
+        def places(self):
+            """
+            Getter for the places owned by the user
+            :return: list of Place instances
+            """
+            return models.storage.related("Place", "user_id", self.id)
+
+        @property
+        def reviews(self):
+            """
+            Getter for the reviews written by the user
+            :return: list of Review instances
+            """
+            return models.storage.related("Review", "user_id", self.id)
@@ -0,0 +1,207 @@
+#!/usr/bin/python3
+"""
+Unit Test for the routes of the ASGI app
+"""
+import unittest
+import os
+import pep8
+import shutil
+import tempfile
+from models.engine.async_db_storage import AsyncSQLiteStorage
+
+storage_type = os.environ.get('HBNB_TYPE_STORAGE')
+if storage_type == 'sqlite':
+    # the views create their storage when imported, on MySQL otherwise
+    from api.v1.asgi import app as asgi_app, views as asgi_views
+
+
+class TestASGIViewsDocs(unittest.TestCase):
+    """Class for testing the style of the ASGI app"""
+
+    def test_pep8_conformance_asgi(self):
+        """Test that the ASGI app conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/asgi/app.py',
+                                    'api/v1/asgi/views.py',
+                                    'api/v1/parsing.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+
+@unittest.skipIf(storage_type != 'sqlite', 'skip if environ is not sqlite')
+class TestASGIViews(unittest.IsolatedAsyncioTestCase):
+    """Test the routes of the ASGI app with the Quart test client"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Points the storage of the app to an empty temporary database"""
+        cls.tmp = tempfile.mkdtemp()
+        cls.path = AsyncSQLiteStorage._AsyncSQLiteStorage__file_path
+        AsyncSQLiteStorage._AsyncSQLiteStorage__file_path = os.path.join(
+            cls.tmp, 'hbnb.db')
+        cls.views_storage = asgi_views.storage
+        asgi_views.storage = asgi_app.storage = AsyncSQLiteStorage()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Restores the storage of the app and the database path"""
+        asgi_views.storage = asgi_app.storage = cls.views_storage
+        AsyncSQLiteStorage._AsyncSQLiteStorage__file_path = cls.path
+        shutil.rmtree(cls.tmp)
+
+    async def asyncSetUp(self):
+        """Starts the app and saves a State"""
+        self.test_app = asgi_app.app.test_app()
+        await self.test_app.startup()
+        self.client = self.test_app.test_client()
+        self.state = await self.post("/states", {"name": "Oregon"})
+
+    async def asyncTearDown(self):
+        """Deletes the State with its children, and stops the app"""
+        await self.client.delete("/api/v1/states/" + self.state["id"])
+        await self.test_app.shutdown()
+
+    async def post(self, url, obj_json, status=201):
+        """
+        posts a JSON body
+        :param url: url under /api/v1
+        :param obj_json: body
+        :param status: expected status code
+        :return: JSON of the response
+        """
+        resp = await self.client.post("/api/v1" + url, json=obj_json)
+        self.assertEqual(resp.status_code, status)
+        return await resp.get_json()
+
+    async def test_status_stats(self):
+        """Test /status, /stats and the 404 handler"""
+        resp = await self.client.get("/api/v1/status")
+        self.assertEqual(await resp.get_json(), {"status": "OK"})
+        resp = await self.client.get("/api/v1/stats")
+        stats = await resp.get_json()
+        self.assertEqual(stats["states"], 1)
+        self.assertEqual(stats["cities"], 0)
+        resp = await self.client.get("/api/v1/missing")
+        self.assertEqual(resp.status_code, 404)
+        self.assertEqual(await resp.get_json(), {"error": "Not found"})
+
+    async def test_state(self):
+        """Test the routes of a State"""
+        url = "/api/v1/states/" + self.state["id"]
+        resp = await self.client.get(url)
+        self.assertEqual(await resp.get_json(), self.state)
+        resp = await self.client.post("/api/v1/states", data="Utah")
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn(b"Not a JSON", await resp.get_data())
+        resp = await self.client.post("/api/v1/states", json={})
+        self.assertIn(b"Missing name", await resp.get_data())
+        resp = await self.client.put(url, json={"name": "Oregon"})
+        self.assertEqual(await resp.get_json(), self.state)
+        resp = await self.client.put(url, json={"name": "Idaho",
+                                                "id": "other"})
+        state = await resp.get_json()
+        self.assertEqual(state["name"], "Idaho")
+        self.assertEqual(state["id"], self.state["id"])
+        self.assertNotEqual(state["updated_at"], self.state["updated_at"])
+        resp = await self.client.put("/api/v1/states/missing", json={})
+        self.assertEqual(resp.status_code, 404)
+
+    async def test_delete_state_cascade(self):
+        """Test that deleting a State deletes its cities, their places and
+        the reviews of the places"""
+        url = "/states/{}/cities".format(self.state["id"])
+        city = await self.post(url, {"name": "Salem"})
+        user = await self.post("/users", {"email": "a@b.c",
+                                          "password": "pwd"})
+        place = await self.post("/cities/{}/places".format(city["id"]),
+                                {"name": "Home", "user_id": user["id"]})
+        review = await self.post("/places/{}/reviews".format(place["id"]),
+                                 {"text": "Nice", "user_id": user["id"]})
+        resp = await self.client.delete("/api/v1/states/" + self.state["id"])
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(await resp.get_json(), {})
+        for url in ("/states/" + self.state["id"], "/cities/" + city["id"],
+                    "/places/" + place["id"], "/reviews/" + review["id"]):
+            resp = await self.client.get("/api/v1" + url)
+            self.assertEqual(resp.status_code, 404)
+        resp = await self.client.delete("/api/v1/users/" + user["id"])
+        self.assertEqual(resp.status_code, 200)
+
+    async def test_cities_pages(self):
+        """Test that the cities of a State are listed by name, one page at
+        a time"""
+        url = "/states/{}/cities".format(self.state["id"])
+        for name in ("Salem", "Bend", "Eugene"):
+            await self.post(url, {"name": name})
+        await self.post(url, {}, 400)
+        await self.post("/states/missing/cities", {"name": "Bend"}, 404)
+        resp = await self.client.get("/api/v1" + url + "?limit=2")
+        self.assertEqual([city["name"] for city in await resp.get_json()],
+                         ["Bend", "Eugene"])
+        self.assertIn('rel="next"', resp.headers["Link"])
+        resp = await self.client.get("/api/v1" + url, query_string={
+            "limit": 2, "cursor": resp.headers["X-Next-Cursor"]})
+        self.assertEqual([city["name"] for city in await resp.get_json()],
+                         ["Salem"])
+        self.assertNotIn("Link", resp.headers)
+        for query in ("limit=0", "limit=x", "cursor=@"):
+            resp = await self.client.get("/api/v1" + url + "?" + query)
+            self.assertEqual(resp.status_code, 400)
+
+    async def test_city_put(self):
+        """Test that PUT does not move a City to another State"""
+        url = "/states/{}/cities".format(self.state["id"])
+        city = await self.post(url, {"name": "Salem"})
+        state = await self.post("/states", {"name": "Idaho"})
+        resp = await self.client.put("/api/v1/cities/" + city["id"], json={
+            "name": "Boise", "state_id": state["id"]})
+        city = await resp.get_json()
+        self.assertEqual(city["name"], "Boise")
+        self.assertEqual(city["state_id"], self.state["id"])
+        resp = await self.client.delete("/api/v1/states/" + state["id"])
+        self.assertEqual(resp.status_code, 200)
+
+    async def test_place_amenities(self):
+        """Test linking and unlinking the amenities of a Place"""
+        city = await self.post("/states/{}/cities".format(self.state["id"]),
+                               {"name": "Salem"})
+        user = await self.post("/users", {"email": "a@b.c",
+                                          "password": "pwd"})
+        await self.post("/cities/{}/places".format(city["id"]),
+                        {"name": "Home", "user_id": "missing"}, 404)
+        place = await self.post("/cities/{}/places".format(city["id"]),
+                                {"name": "Home", "user_id": user["id"]})
+        amenity = await self.post("/amenities", {"name": "Wifi"})
+        url = "/places/{}/amenities/{}".format(place["id"], amenity["id"])
+        await self.post(url, None)
+        await self.post(url, None, 200)
+        resp = await self.client.get(
+            "/api/v1/places/{}/amenities".format(place["id"]))
+        self.assertEqual([obj["id"] for obj in await resp.get_json()],
+                         [amenity["id"]])
+        for status in (200, 404):
+            resp = await self.client.delete("/api/v1" + url)
+            self.assertEqual(resp.status_code, status)
+        for url in ("/amenities/" + amenity["id"], "/users/" + user["id"]):
+            resp = await self.client.delete("/api/v1" + url)
+            self.assertEqual(resp.status_code, 200)
+
+    async def test_user(self):
+        """Test that a User needs a password and keeps its email"""
+        await self.post("/users", {"email": "a@b.c"}, 400)
+        user = await self.post("/users", {"email": "a@b.c",
+                                          "password": "pwd"})
+        url = "/api/v1/users/" + user["id"]
+        resp = await self.client.put(url, json={"email": "d@e.f",
+                                                "first_name": "Ann"})
+        user = await resp.get_json()
+        self.assertEqual(user["email"], "a@b.c")
+        self.assertEqual(user["first_name"], "Ann")
+        resp = await self.client.delete(url)
+        self.assertEqual(resp.status_code, 200)
+        resp = await self.client.delete(url)
+        self.assertEqual(resp.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
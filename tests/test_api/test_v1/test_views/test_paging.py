@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+"""
+Unit Test for the pagination of the routes of the Flask app
+"""
+import unittest
+import models
+from api.v1 import parsing
+from api.v1.app import app
+from models.city import City
+from models.state import State
+from tests.test_models.test_engine.test_file_storage import \
+    FileStorageTestCase
+import pep8
+
+# HBNB_TYPE_STORAGE=sqlite also sets storage_t to 'db'
+storage_type = models.storage_t
+
+
+class TestPagingDocs(unittest.TestCase):
+    """Class for testing the style of the pagination"""
+
+    def test_pep8_conformance_paging(self):
+        """Test that the pagination conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/paging.py',
+                                    'api/v1/parsing.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+
+@unittest.skipIf(storage_type == 'db', 'skip if environ is db')
+class TestPaging(FileStorageTestCase):
+    """Test the pages of the Flask routes listing objects"""
+
+    def setUp(self):
+        """Saves States, one of them with cities, and makes a client"""
+        super().setUp()
+        self.states = [State(name=str(i)) for i in range(7)]
+        for state in self.states:
+            self.storage.new(state)
+        self.cities = [City(name=name, state_id=self.states[0].id)
+                       for name in ("Salem", "Bend", "Eugene", "Astoria")]
+        for city in self.cities:
+            self.storage.new(city)
+        self.storage.save()
+        self.client = app.test_client()
+        self.sizes = parsing.PAGE_SIZE, parsing.MAX_PAGE_SIZE
+
+    def tearDown(self):
+        """Restores the page sizes"""
+        parsing.PAGE_SIZE, parsing.MAX_PAGE_SIZE = self.sizes
+        super().tearDown()
+
+    def walk(self, url):
+        """
+        reads all the pages of a list, following the Link headers
+        :param url: url of the first page
+        :return: list of the pages, as lists of JSON objects
+        """
+        pages = []
+        while True:
+            resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200)
+            pages.append(resp.get_json())
+            if "Link" not in resp.headers:
+                self.assertNotIn("X-Next-Cursor", resp.headers)
+                return pages
+            link = resp.headers["Link"]
+            self.assertTrue(link.endswith('>; rel="next"'))
+            self.assertIn("cursor=" + resp.headers["X-Next-Cursor"], link)
+            url = link[1:link.index(">")]
+
+    def test_walk_states(self):
+        """Test that the pages of /states hold every State once, by id"""
+        pages = self.walk("/api/v1/states?limit=3")
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual([state["id"] for page in pages for state in page],
+                         sorted(state.id for state in self.states))
+
+    def test_walk_cities(self):
+        """Test that the cities of a State are listed by name"""
+        url = "/api/v1/states/{}/cities?limit=2".format(self.states[0].id)
+        pages = self.walk(url)
+        self.assertEqual([[city["name"] for city in page] for page in pages],
+                         [["Astoria", "Bend"], ["Eugene", "Salem"]])
+        resp = self.client.get("/api/v1/states/missing/cities")
+        self.assertEqual(resp.status_code, 404)
+
+    def test_limits(self):
+        """Test the default and the largest number of objects of a page"""
+        parsing.PAGE_SIZE, parsing.MAX_PAGE_SIZE = 2, 4
+        resp = self.client.get("/api/v1/states")
+        self.assertEqual(len(resp.get_json()), 2)
+        self.assertIn("limit=2&", resp.headers["Link"])
+        resp = self.client.get("/api/v1/states?limit=100")
+        self.assertEqual(len(resp.get_json()), 4)
+        self.assertIn("limit=4&", resp.headers["Link"])
+        self.assertEqual(len(self.walk("/api/v1/states?limit=7")), 2)
+
+    def test_bad_parameters(self):
+        """Test that a bad limit or cursor answers 400"""
+        for query, error in (("limit=0", b"Invalid limit"),
+                             ("limit=-1", b"Invalid limit"),
+                             ("limit=x", b"Invalid limit"),
+                             ("cursor=@@", b"Invalid cursor")):
+            resp = self.client.get("/api/v1/states?" + query)
+            self.assertEqual(resp.status_code, 400)
+            self.assertIn(error, resp.get_data())
+        # a cursor of a deleted city, whose name is unknown
+        cursor = parsing.encode_cursor("missing")
+        resp = self.client.get("/api/v1/states/{}/cities?cursor={}".format(
+            self.states[0].id, cursor))
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn(b"Invalid cursor", resp.get_data())
+
+    def test_name_types(self):
+        """Test that cities stay listed after a PUT of a name that is not a
+        text"""
+        for city, name in zip(self.cities, (5, None)):
+            resp = self.client.put("/api/v1/cities/" + city.id,
+                                   json={"name": name})
+            self.assertEqual(resp.status_code, 200)
+        url = "/api/v1/states/{}/cities".format(self.states[0].id)
+        self.assertEqual([city["name"] for city in self.walk(url)[0]],
+                         [None, 5, "Astoria", "Eugene"])
+
+
+if __name__ == '__main__':
+    unittest.main()
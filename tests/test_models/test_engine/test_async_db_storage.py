@@ -0,0 +1,150 @@
+#!/usr/bin/python3
+"""
+Unit Test for AsyncDBStorage Class
+"""
+import asyncio
+import unittest
+from models.engine.async_db_storage import AsyncDBStorage
+from models.engine.async_db_storage import AsyncSQLiteStorage
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+import os
+import pep8
+import shutil
+import tempfile
+
+storage_type = os.environ.get('HBNB_TYPE_STORAGE')
+
+
+class TestAsyncDBStorageDocs(unittest.TestCase):
+    """Class for testing documentation and style of AsyncDBStorage"""
+
+    def test_pep8_conformance_async_db_storage(self):
+        """Test that models/engine/async_db_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/async_db_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_doc_class(self):
+        """Test documentation for AsyncDBStorage classes"""
+        self.assertIsNot(AsyncDBStorage.__doc__, None)
+        self.assertIsNot(AsyncSQLiteStorage.__doc__, None)
+        for method in ('all', 'new', 'get', 'page', 'count', 'counts', 'save',
+                       'delete', 'reload', 'close', 'dispose'):
+            self.assertIsNot(getattr(AsyncDBStorage, method).__doc__, None)
+
+
+@unittest.skipIf(storage_type != 'sqlite', 'skip if environ is not sqlite')
+class TestAsyncSQLiteStorage(unittest.IsolatedAsyncioTestCase):
+    """Test the asyncio storage engine on SQLite"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Points the storage to an empty temporary database"""
+        cls.tmp = tempfile.mkdtemp()
+        cls.path = AsyncSQLiteStorage._AsyncSQLiteStorage__file_path
+        AsyncSQLiteStorage._AsyncSQLiteStorage__file_path = os.path.join(
+            cls.tmp, 'hbnb.db')
+
+    @classmethod
+    def tearDownClass(cls):
+        """Restores the database path"""
+        AsyncSQLiteStorage._AsyncSQLiteStorage__file_path = cls.path
+        shutil.rmtree(cls.tmp)
+
+    async def asyncSetUp(self):
+        """Saves a State and one of its cities"""
+        self.storage = AsyncSQLiteStorage()
+        await self.storage.reload()
+        self.state = State(name="Oregon")
+        self.city = City(name="Salem", state_id=self.state.id)
+        self.storage.new(self.state)
+        self.storage.new(self.city)
+        await self.storage.save()
+        await self.storage.close()
+
+    async def asyncTearDown(self):
+        """Deletes the saved objects, in a session of its own as each test
+        runs in a task of its own"""
+        for cls, id in (("City", self.city.id), ("State", self.state.id)):
+            await self.storage.delete(await self.storage.get(cls, id))
+            await self.storage.save()
+        await self.storage.close()
+        await self.storage.dispose()
+
+    async def test_get_count(self):
+        """Test get(), count() and counts()"""
+        state = await self.storage.get("State", self.state.id)
+        self.assertEqual(state.name, "Oregon")
+        self.assertIs(await self.storage.get(State, self.state.id), state)
+        self.assertIsNone(await self.storage.get(State, "missing"))
+        count = await self.storage.count("City")
+        city = City(name="Eugene", state_id=self.state.id)
+        self.storage.new(city)
+        await self.storage.save()
+        self.assertEqual(await self.storage.count(City), count + 1)
+        await self.storage.delete(city)
+        await self.storage.save()
+        counts = await self.storage.counts()
+        self.assertNotIn("BaseModel", counts)
+        self.assertEqual(sum(counts.values()), await self.storage.count())
+        await self.storage.close()
+
+    async def test_all(self):
+        """Test that all() reads the objects and the relationships of load"""
+        states = await self.storage.all(State, load=("cities",))
+        state = states["State." + self.state.id]
+        self.assertEqual([city.id for city in state.cities], [self.city.id])
+        self.assertIn("City." + self.city.id, await self.storage.all())
+        await self.storage.close()
+
+    async def test_page(self):
+        """Test that page() reads a class in order, one page at a time"""
+        city = City(name="Bend", state_id=self.state.id)
+        self.storage.new(city)
+        await self.storage.save()
+        where = {"state_id": self.state.id}
+        objs, after_id = await self.storage.page("City", None, 1, "name",
+                                                 where)
+        self.assertEqual([city.name for city in objs], ["Bend"])
+        objs, after_id = await self.storage.page("City", after_id, 1, "name",
+                                                 where)
+        self.assertEqual([city.name for city in objs], ["Salem"])
+        self.assertIsNone(after_id)
+        with self.assertRaises(ValueError):
+            await self.storage.page("City", "missing", 1, "name")
+        await self.storage.delete(city)
+        await self.storage.save()
+        await self.storage.close()
+
+    async def test_delete_cascade(self):
+        """Test that delete() removes the children of an object"""
+        user = User(email="a@b.c", password="pwd")
+        place = Place(name="Home", city_id=self.city.id, user_id=user.id)
+        self.storage.new(user)
+        self.storage.new(place)
+        await self.storage.save()
+        await self.storage.delete(user)
+        await self.storage.save()
+        await self.storage.close()
+        self.assertIsNone(await self.storage.get("Place", place.id))
+        await self.storage.close()
+
+    async def test_sessions(self):
+        """Test that concurrent tasks get a session each"""
+        async def read():
+            """Reads the State in a task of its own"""
+            try:
+                return await self.storage.get("State", self.state.id)
+            finally:
+                await self.storage.close()
+        states = await asyncio.gather(*[read() for i in range(20)])
+        self.assertEqual(len({id(state) for state in states}), 20)
+        self.assertEqual({state.name for state in states}, {"Oregon"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,6 +8,7 @@ from models import *
 import os
 from models.base_model import Base
 from models.engine.db_storage import DBStorage
+from sqlalchemy import event
 
 storage_type = os.environ.get('HBNB_TYPE_STORAGE')
 storage = DBStorage()
@@ -274,6 +275,45 @@ class TestStorageCount(unittest.TestCase):
         result = storage.count(cls="City")
         self.assertEqual(len(storage.all("City")), result)
 
+@unittest.skipIf(storage_type != 'db', 'skip if environ is not db')
+class TestStorageExplain(unittest.TestCase):
+    """Test that the queries of the API use the indexes of the models"""
+
+    def explain(self, *args):
+        """Returns the indexes MySQL picks for the query of page()"""
+        statements = []
+        engine = storage._DBStorage__engine
+
+        def capture(conn, cursor, statement, parameters, *args):
+            """Records the queries sent to the database"""
+            statements.append((statement, parameters))
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            storage.page(*args)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        statement, parameters = statements[-1]
+        with engine.connect() as connection:
+            plan = connection.exec_driver_sql(
+                "EXPLAIN " + statement, parameters).mappings().all()
+        return [row["key"] for row in plan]
+
+    def test_explain(self):
+        """Test the indexes used by the paginated routes"""
+        self.assertEqual(
+            self.explain("City", None, 10, "name", {"state_id": "x"}),
+            ["ix_cities_state_id_name"])
+        self.assertEqual(
+            self.explain("Place", None, 10, "id", {"city_id": "x"}),
+            ["ix_places_city_id"])
+        self.assertEqual(
+            self.explain("Review", None, 10, "created_at",
+                         {"place_id": "x"}),
+            ["ix_reviews_place_id_created_at"])
+        self.assertEqual(
+            self.explain("User", None, 10, "id", {"email": "x"}),
+            ["ix_users_email"])
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -16,16 +16,55 @@ from models.user import User
 import json
 import os
 import pep8
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
 
 FileStorage = FileStorage
 storage = models.storage
 F = './file.json'
-storage_type = os.environ.get('HBNB_TYPE_STORAGE')
+# HBNB_TYPE_STORAGE=sqlite also sets storage_t to 'db'
+storage_type = models.storage_t
 
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
 
 
+class FileStorageTestCase(unittest.TestCase):
+    """Points FileStorage to an empty temporary file for each test, with the
+    class attributes of settings, and restores them afterwards"""
+    settings = {}
+    """settings - FileStorage setting names, without their _FileStorage__
+    prefix, and the values the tests of a class run with"""
+    SAVED = ('file_path', 'format', 'journal', 'journal_ratio', 'shards',
+             'shared', 'threads', 'lazy', 'commit_window', 'commit_batch')
+    """SAVED - names of the settings restored after each test, which can
+    also change during a test"""
+
+    def setUp(self):
+        """Points FileStorage to an empty temporary file"""
+        self.tmp = tempfile.mkdtemp()
+        self.fname = os.path.join(self.tmp, 'file.json')
+        self.saved = {name: getattr(FileStorage, '_FileStorage__' + name)
+                      for name in self.SAVED}
+        for name, value in dict(self.settings,
+                                file_path=self.fname).items():
+            setattr(FileStorage, '_FileStorage__' + name, value)
+        self.storage = FileStorage()
+        self.storage.reload()
+
+    def tearDown(self):
+        """Writes the waiting saves, then restores the FileStorage
+        settings"""
+        self.storage.flush()
+        for name, value in self.saved.items():
+            setattr(FileStorage, '_FileStorage__' + name, value)
+        shutil.rmtree(self.tmp)
+        self.storage.reload()
+
+
 @unittest.skipIf(storage_type == 'db', 'skip if environ is db')
 class TestFileStorageDocs(unittest.TestCase):
     """Class for testing FileStorage documentation"""
@@ -182,5 +221,776 @@ class TestFileStorageAdditional(unittest.TestCase):
         self.assertTrue(result)
 
 
+@unittest.skipIf(storage_type == 'db', 'skip if environ is db')
+class TestFileStorageClasses(FileStorageTestCase):
+    """Tests for the per-class partition of FileStorage"""
+
+    def test_all_by_class(self):
+        """Test that all(cls) only returns objects of that class"""
+        state = State(name="California")
+        city = City(name="Fremont", state_id=state.id)
+        self.storage.new(state)
+        self.storage.new(city)
+        self.assertEqual(self.storage.all("State"),
+                         {"State." + state.id: state})
+        self.assertEqual(self.storage.all(City), {"City." + city.id: city})
+        self.assertEqual(self.storage.all("Review"), {})
+        self.assertEqual(self.storage.all("State", load=("cities",)),
+                         {"State." + state.id: state})
+        self.assertIs(self.storage.get(State, state.id, load=("cities",)),
+                      state)
+
+    def test_iter_all(self):
+        """Test that iter_all() goes over the same objects as all()"""
+        state = State(name="Idaho")
+        self.storage.new(state)
+        self.storage.new(City(name="Boise", state_id=state.id))
+        self.assertEqual(list(self.storage.iter_all(State)), [state])
+        self.assertEqual(list(self.storage.iter_all()),
+                         list(self.storage.all().values()))
+
+    def test_bulk(self):
+        """Test that bulk_new() and bulk_update() write all objects"""
+        states = [State(name=str(i)) for i in range(3)]
+        self.storage.bulk_new(states)
+        self.storage.reload()
+        self.assertEqual(self.storage.count(State), 3)
+        rows = [{"id": state.id, "name": "Maine"} for state in states[:2]]
+        self.assertEqual(self.storage.bulk_update(State, rows), 2)
+        with self.assertRaises(ValueError):
+            self.storage.bulk_update("State", [{"id": "missing"}])
+        self.storage.reload()
+        names = sorted(state.name
+                       for state in self.storage.all(State).values())
+        self.assertEqual(names, ["2", "Maine", "Maine"])
+
+    def test_count_by_class(self):
+        """Test that count(cls) follows new() and delete()"""
+        states = [State(name=str(i)) for i in range(3)]
+        for state in states:
+            self.storage.new(state)
+        self.storage.new(User())
+        self.assertEqual(self.storage.count("State"), 3)
+        self.assertEqual(self.storage.count(State), 3)
+        self.assertEqual(self.storage.count(), 4)
+        self.storage.delete(states[0])
+        self.assertEqual(self.storage.count("State"), 2)
+        self.assertNotIn("State." + states[0].id, self.storage.all(State))
+
+    def test_counts(self):
+        """Test that counts() returns the count of every class"""
+        self.storage.new(State(name="Utah"))
+        self.storage.new(User())
+        self.storage.new(User())
+        counts = self.storage.counts()
+        self.assertEqual(set(counts), set(FileStorage.CNC))
+        self.assertEqual(counts["State"], 1)
+        self.assertEqual(counts["User"], 2)
+        self.assertEqual(counts["Review"], 0)
+
+    def test_reload_partitions(self):
+        """Test that reload() rebuilds the class partition"""
+        state = State(name="Nevada")
+        self.storage.new(state)
+        self.storage.new(Amenity(name="Wifi"))
+        self.storage.save()
+        self.storage.reload()
+        self.assertEqual(self.storage.count("State"), 1)
+        self.assertEqual(self.storage.count("Amenity"), 1)
+        self.assertIn("State." + state.id, self.storage.all("State"))
+
+    def test_one_record_per_line(self):
+        """Test that save() writes valid JSON with one record per line"""
+        states = [State(name=str(i)) for i in range(3)]
+        for state in states:
+            self.storage.new(state)
+        self.storage.save()
+        with open(FileStorage._FileStorage__file_path, "r") as f:
+            lines = f.read().splitlines()
+            f.seek(0)
+            data = json.load(f)
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(set(data), set("State." + s.id for s in states))
+        self.storage.reload()
+        self.assertEqual(self.storage.count("State"), 3)
+
+    def test_reload_single_line(self):
+        """Test that reload() reads JSON files not written by save()"""
+        state = State(name="Maine")
+        with open(FileStorage._FileStorage__file_path, "w") as f:
+            json.dump({"State." + state.id: state.to_json()}, f)
+        self.storage.reload()
+        self.assertEqual(self.storage.get("State", state.id).name, "Maine")
+
+    def test_reload_indented(self):
+        """Test that reload() reads indented JSON files, whose first line is
+        also a lone {"""
+        state = State(name="Maine")
+        with open(FileStorage._FileStorage__file_path, "w") as f:
+            json.dump({"State." + state.id: state.to_json()}, f, indent=4)
+        for lazy in (False, True):
+            FileStorage._FileStorage__lazy = lazy
+            self.storage.reload()
+            self.assertEqual(self.storage.get("State", state.id).name,
+                             "Maine")
+
+    def test_get(self):
+        """Test that get() finds objects by class and id"""
+        state = State(name="Oregon")
+        self.storage.new(state)
+        self.assertIs(self.storage.get("State", state.id), state)
+        self.assertIs(self.storage.get(State, state.id), state)
+        self.assertIsNone(self.storage.get("City", state.id))
+        self.assertIsNone(self.storage.get("State", "doesnotexist"))
+
+    def test_get_many(self):
+        """Test that get_many() keeps the order of ids"""
+        first, second = State(name="Ohio"), State(name="Utah")
+        self.storage.new(first)
+        self.storage.new(second)
+        result = self.storage.get_many("State",
+                                       [second.id, "nope", first.id])
+        self.assertEqual(result, [second, None, first])
+        self.assertEqual(self.storage.get_many(State, []), [])
+
+
+@unittest.skipIf(storage_type == 'db', 'skip if environ is db')
+class TestFileStorageRelated(FileStorageTestCase):
+    """Tests for the foreign key indexes of FileStorage"""
+
+    def test_state_cities(self):
+        """Test that State.cities follows new(), delete() and reassignment"""
+        california, nevada = State(name="California"), State(name="Nevada")
+        city = City(name="Fremont", state_id=california.id)
+        for obj in (california, nevada, city):
+            self.storage.new(obj)
+        self.assertEqual(california.cities, [city])
+        self.assertEqual(nevada.cities, [])
+        city.state_id = nevada.id
+        self.assertEqual(california.cities, [])
+        self.assertEqual(nevada.cities, [city])
+        self.storage.delete(city)
+        self.assertEqual(nevada.cities, [])
+
+    def test_delete_many(self):
+        """Test that delete_many() removes objects and their index entries"""
+        place = Place(name="Loft")
+        reviews = [Review(text=str(i), place_id=place.id) for i in range(3)]
+        for obj in [place] + reviews:
+            self.storage.new(obj)
+        self.storage.delete_many(place.reviews)
+        self.assertEqual(place.reviews, [])
+        self.assertEqual(self.storage.count("Review"), 0)
+        with open(FileStorage._FileStorage__file_path, "r") as f:
+            self.assertEqual(list(json.load(f)), ["Place." + place.id])
+
+    def test_place_and_user_relations(self):
+        """Test that Place.reviews and User.places/reviews use the index"""
+        user = User(email="a@b.c", password="pwd")
+        place = Place(name="Loft", user_id=user.id, city_id="c")
+        review = Review(text="Nice", place_id=place.id, user_id=user.id)
+        for obj in (user, place, review):
+            self.storage.new(obj)
+        self.assertEqual(place.reviews, [review])
+        self.assertEqual(user.places, [place])
+        self.assertEqual(user.reviews, [review])
+        self.assertEqual(self.storage.related("City", "state_id", "x"), [])
+
+    def test_place_amenities(self):
+        """Test that Place.amenities resolves amenity_ids"""
+        place, wifi = Place(name="Loft"), Amenity(name="Wifi")
+        self.storage.new(place)
+        self.storage.new(wifi)
+        place.amenities = wifi
+        place.amenities = wifi
+        self.assertEqual(place.amenity_ids, [wifi.id])
+        self.assertEqual(place.amenities, [wifi])
+        self.assertEqual(Place.amenity_ids, [])
+
+
+@unittest.skipIf(storage_type == 'db', 'skip if environ is db')
+class TestFileStorageClose(FileStorageTestCase):
+    """Tests for the change detection of FileStorage.close()"""
+
+    def test_close_keeps_objects(self):
+        """Test that close() does not reload an unchanged file"""
+        state = State(name="Idaho")
+        self.storage.new(state)
+        self.storage.save()
+        self.storage.close()
+        self.assertIs(self.storage.get("State", state.id), state)
+        self.storage.close()
+        self.assertIs(self.storage.get("State", state.id), state)
+
+    def test_close_reloads_changed_file(self):
+        """Test that close() reloads a file written by someone else"""
+        state = State(name="Idaho")
+        self.storage.new(state)
+        self.storage.save()
+        fname = FileStorage._FileStorage__file_path
+        with open(fname, "r") as f:
+            data = json.load(f)
+        data["State." + state.id]["name"] = "Iowa"
+        data["State.other"] = dict(data["State." + state.id], id="other")
+        with open(fname, "w") as f:
+            json.dump(data, f)
+        self.storage.close()
+        self.assertEqual(self.storage.get("State", state.id).name, "Iowa")
+        self.assertEqual(self.storage.count("State"), 2)
+
+
+@unittest.skipIf(storage_type == 'db', 'skip if environ is db')
+class TestFileStorageJournal(FileStorageTestCase):
+    """Tests for the journal mode of FileStorage"""
+
+    settings = {'journal': True, 'journal_ratio': 100.0}
+
+    def setUp(self):
+        """Saves a State to the JSON file"""
+        super().setUp()
+        self.state = State(name="Texas")
+        self.state.save()
+
+    def test_save_appends(self):
+        """Test that save() appends pending objects only"""
+        with open(self.fname, "r") as f:
+            snapshot = f.read()
+        city = City(name="Austin", state_id=self.state.id)
+        city.save()
+        with open(self.fname, "r") as f:
+            self.assertEqual(f.read(), snapshot)
+        with open(self.fname + '.log', "r") as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(lines, [{"key": "City." + city.id,
+                                  "obj": city.to_json()}])
+
+    def test_reload_replays(self):
+        """Test that reload() applies the journal to the JSON file"""
+        city = City(name="Austin", state_id=self.state.id)
+        city.save()
+        self.state.name = "Lone Star"
+        self.state.save()
+        self.storage.delete(city)
+        self.storage.reload()
+        self.assertEqual(self.storage.get("State", self.state.id).name,
+                         "Lone Star")
+        self.assertIsNone(self.storage.get("City", city.id))
+        self.assertEqual(self.storage.count(), 1)
+
+    def test_save_appends_changes(self):
+        """Test that save() appends only the changed attributes"""
+        self.state.name = "Lone Star"
+        self.state.save()
+        with open(self.fname + '.log', "r") as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(lines, [{"key": "State." + self.state.id,
+                                  "set": {"name": "Lone Star",
+                                          "updated_at":
+                                          str(self.state.updated_at)}}])
+        self.storage.reload()
+        state = self.storage.get("State", self.state.id)
+        self.assertEqual(state.name, "Lone Star")
+        self.assertEqual(state.updated_at, self.state.updated_at)
+        self.assertEqual(state.created_at, self.state.created_at)
+
+    def test_save_changed_object(self):
+        """Test that save() writes a change made without new()"""
+        self.state.name = "Lone Star"
+        self.storage.save()
+        self.storage.reload()
+        self.assertEqual(self.storage.get("State", self.state.id).name,
+                         "Lone Star")
+
+    def test_reload_ignores_torn_record(self):
+        """Test that an incomplete last journal line is ignored"""
+        City(name="Austin", state_id=self.state.id).save()
+        with open(self.fname + '.log', "a") as f:
+            f.write('{"key": "City.torn", "ob')
+        self.storage.reload()
+        self.assertEqual(self.storage.count("City"), 1)
+
+    def test_compaction(self):
+        """Test that a large journal is compacted into the JSON file"""
+        FileStorage._FileStorage__journal_ratio = 0.0
+        city = City(name="Austin", state_id=self.state.id)
+        city.save()
+        self.assertFalse(os.path.exists(self.fname + '.log'))
+        with open(self.fname, "r") as f:
+            self.assertIn("City." + city.id, json.load(f))
+
+
+@unittest.skipIf(storage_type == 'db', 'skip if environ is db')
+class TestFileStorageChanges(FileStorageTestCase):
+    """Tests for the change tracking of FileStorage"""
+
+    def setUp(self):
+        """Creates a State that is not stored yet"""
+        super().setUp()
+        self.state = State(name="Maine")
+        self.key = "State." + self.state.id
+
+    def test_changes(self):
+        """Test the attributes reported as changed"""
+        self.assertIsNone(self.state.changes())
+        self.storage.new(self.state)
+        self.state.name = "Vermont"
+        self.assertIsNone(self.state.changes())
+        self.storage.save()
+        self.assertEqual(self.state.changes(), set())
+        self.state.name = "Maine"
+        self.assertEqual(self.state.changes(), {"name"})
+        self.state.save()
+        self.assertEqual(self.state.changes(), set())
+        self.storage.reload()
+        state = self.storage.get("State", self.state.id)
+        self.assertEqual(state.changes(), set())
+        self.assertIsNone(self.state.changes())
+
+    def test_cached_text(self):
+        """Test that save() reuses the JSON text of unchanged objects"""
+        self.storage.new(self.state)
+        self.storage.save()
+        texts = FileStorage._FileStorage__texts
+        self.assertEqual(json.loads(texts[self.key]), self.state.to_json())
+        texts[self.key] = json.dumps(dict(self.state.to_json(),
+                                          name="Cached"))
+        self.storage.new(City(name="Portland", state_id=self.state.id))
+        self.storage.save()
+        with open(self.fname, "r") as f:
+            self.assertEqual(json.load(f)[self.key]["name"], "Cached")
+        self.state.name = "Maine"
+        self.assertNotIn(self.key, texts)
+        self.storage.save()
+        with open(self.fname, "r") as f:
+            self.assertEqual(json.load(f)[self.key]["name"], "Maine")
+
+
+@unittest.skipIf(storage_type == 'db', 'skip if environ is db')
+class TestFileStorageShared(FileStorageTestCase):
+    """Tests for the multi-process mode of FileStorage"""
+
+    settings = {'shared': True}
+
+    def setUp(self):
+        """Saves a State to the shared file"""
+        super().setUp()
+        self.state = State(name="Utah")
+        self.state.save()
+
+    def other_process(self, code, env=None):
+        """Runs code in another process sharing the temporary file"""
+        env = dict(os.environ, HBNB_FILE_SHARED='1', **(env or {}))
+        subprocess.run([sys.executable, '-c', "\n".join([
+            "import models",
+            "from models.engine.file_storage import FileStorage",
+            "from models.amenity import Amenity",
+            "from models.state import State",
+            "FileStorage._FileStorage__file_path = {!r}".format(self.fname),
+            "models.storage.reload()",
+            code])], env=env, check=True)
+
+    def test_save_keeps_other_writes(self):
+        """Test that save() does not overwrite the writes of others"""
+        self.other_process("State(name='Idaho').save()")
+        State(name="Iowa").save()
+        self.storage.reload()
+        self.assertEqual(sorted(s.name for s in
+                                self.storage.all(State).values()),
+                         ["Idaho", "Iowa", "Utah"])
+
+    def test_refresh_journal(self):
+        """Test that refresh() only replays the new journal records"""
+        FileStorage._FileStorage__journal = True
+        FileStorage._FileStorage__journal_ratio = 100.0
+        other = State(name="Nevada")
+        other.save()
+        self.other_process("s = models.storage.get('State', {!r})\n"
+                           "s.name = 'Arizona'\n"
+                           "s.save()\n"
+                           "Amenity(name='Sauna').save()".format(
+                               self.state.id),
+                           {'HBNB_FILE_JOURNAL': '1',
+                            'HBNB_FILE_JOURNAL_RATIO': '100'})
+        self.storage.refresh()
+        FileStorage._FileStorage__journal_ratio = 1.0
+        self.assertEqual(self.storage.get(State, self.state.id).name,
+                         "Arizona")
+        self.assertEqual(self.storage.count(Amenity), 1)
+        self.assertIs(self.storage.get(State, other.id), other)
+
+    def test_refresh_shards(self):
+        """Test that refresh() only reads the shards that changed"""
+        FileStorage._FileStorage__shards = 1
+        self.storage.save()
+        self.other_process("Amenity(name='Gym').save()",
+                           {'HBNB_FILE_SHARDS': '1'})
+        self.storage.refresh()
+        self.assertEqual(self.storage.count(Amenity), 1)
+        self.assertIs(self.storage.get(State, self.state.id), self.state)
+
+
+@unittest.skipIf(storage_type == 'db', 'skip if environ is db')
+class TestFileStorageThreads(FileStorageTestCase):
+    """Tests for the use of FileStorage by several threads"""
+
+    settings = {'threads': True}
+
+    def test_all_copy(self):
+        """Test that all() returns a copy of __objects"""
+        self.storage.new(State(name="Oregon"))
+        objs = self.storage.all()
+        self.assertIsNot(objs, FileStorage._FileStorage__objects)
+        self.assertEqual(objs, FileStorage._FileStorage__objects)
+
+    def test_concurrent_saves(self):
+        """Test saving from several threads while others read"""
+        errors = []
+        done = threading.Event()
+
+        def write(n):
+            """Saves new objects and changes them"""
+            try:
+                for i in range(10):
+                    state = State(name="{}-{}".format(n, i))
+                    state.save()
+                    state.name += "!"
+                    self.storage.new(City(name="c", state_id=state.id))
+                    self.storage.save()
+            except Exception as e:
+                errors.append(e)
+
+        def read():
+            """Iterates the objects until the writers are done"""
+            try:
+                while not done.is_set():
+                    for obj in self.storage.all().values():
+                        obj.to_json()
+                    self.storage.close()
+            except Exception as e:
+                errors.append(e)
+
+        readers = [threading.Thread(target=read) for n in range(2)]
+        writers = [threading.Thread(target=write, args=(n,))
+                   for n in range(4)]
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        done.set()
+        for thread in readers:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.storage.reload()
+        self.assertEqual(self.storage.count(State), 40)
+        self.assertEqual(self.storage.count(City), 40)
+        for state in self.storage.all(State).values():
+            self.assertTrue(state.name.endswith("!"))
+
+
+@unittest.skipIf(storage_type == 'db', 'skip if environ is db')
+class TestFileStorageGroupCommit(FileStorageTestCase):
+    """Tests for the group commit mode of FileStorage"""
+
+    settings = {'commit_window': 60000.0, 'commit_batch': 3}
+
+    def test_batch(self):
+        """Test that saves are written together once the batch is full"""
+        first = State(name="Maine").save()
+        second = State(name="Ohio").save()
+        self.assertIs(first, second)
+        self.assertFalse(first.is_set())
+        self.assertFalse(os.path.exists(self.fname))
+        third = State(name="Utah").save()
+        self.assertTrue(third.is_set())
+        self.assertTrue(first.wait(0))
+        with open(self.fname, "r") as f:
+            self.assertEqual(len(json.load(f)), 3)
+
+    def test_window(self):
+        """Test that saves are written once the window elapsed"""
+        FileStorage._FileStorage__commit_window = 5.0
+        commit = State(name="Maine").save()
+        self.assertTrue(commit.wait(5))
+        self.assertTrue(os.path.exists(self.fname))
+
+    def test_flush(self):
+        """Test that flush() and reload() write the waiting saves"""
+        state = State(name="Maine")
+        commit = state.save()
+        self.storage.reload()
+        self.assertTrue(commit.is_set())
+        self.assertEqual(self.storage.get("State", state.id).name, "Maine")
+
+    def test_failed_flush(self):
+        """Test that a failed write releases its saves with the error, and
+        that the next save starts a new group commit"""
+        fname = os.path.join(self.tmp, 'missing', 'file.json')
+        FileStorage._FileStorage__file_path = fname
+        first = State(name="Maine")
+        commit = first.save()
+        with self.assertRaises(FileNotFoundError):
+            self.storage.flush()
+        self.assertTrue(commit.is_set())
+        with self.assertRaises(FileNotFoundError):
+            commit.wait(0)
+        os.mkdir(os.path.dirname(fname))
+        second = State(name="Ohio")
+        retry = second.save()
+        self.assertIsNot(retry, commit)
+        self.storage.flush()
+        self.assertTrue(retry.wait(0))
+        with open(fname, "r") as f:
+            self.assertEqual(set(json.load(f)), {"State." + first.id,
+                                                 "State." + second.id})
+
+
+@unittest.skipIf(storage_type == 'db', 'skip if environ is db')
+class TestFileStorageLazy(FileStorageTestCase):
+    """Tests for the lazy mode of FileStorage"""
+
+    def setUp(self):
+        """Saves a few objects to a temporary file and reloads it lazily"""
+        super().setUp()
+        self.state = State(name="Kansas")
+        self.city = City(name="Topeka", state_id=self.state.id)
+        self.user = User(email="a@b.c", password="pwd")
+        for obj in (self.state, self.city, self.user):
+            self.storage.new(obj)
+        self.storage.save()
+        FileStorage._FileStorage__lazy = True
+        self.storage.reload()
+
+    def raw(self, key):
+        """Returns what is stored under key, without instantiating it"""
+        return FileStorage._FileStorage__objects[key]
+
+    def test_reload_keeps_records(self):
+        """Test that reload() does not instantiate objects"""
+        self.assertIsInstance(self.raw("State." + self.state.id), str)
+        self.assertEqual(self.storage.count("City"), 1)
+        self.assertIsInstance(self.raw("City." + self.city.id), str)
+
+    def test_get_instantiates(self):
+        """Test that get() instantiates and caches one object"""
+        state = self.storage.get("State", self.state.id)
+        self.assertIsInstance(state, State)
+        self.assertEqual(state.created_at, self.state.created_at)
+        self.assertIs(self.storage.get(State, self.state.id), state)
+        self.assertIsInstance(self.raw("City." + self.city.id), str)
+        self.assertEqual([c.id for c in state.cities], [self.city.id])
+        self.assertIsInstance(self.raw("City." + self.city.id), City)
+
+    def test_save_records(self):
+        """Test that save() writes records that were never accessed"""
+        self.storage.get("State", self.state.id).name = "Kentucky"
+        self.storage.save()
+        FileStorage._FileStorage__lazy = False
+        self.storage.reload()
+        self.assertEqual(self.storage.get("State", self.state.id).name,
+                         "Kentucky")
+        self.assertEqual(self.storage.get("City", self.city.id).name,
+                         "Topeka")
+        self.assertEqual(self.storage.get("User", self.user.id).password,
+                         self.user.password)
+
+
+@unittest.skipIf(storage_type == 'db', 'skip if environ is db')
+class TestFileStorageShards(FileStorageTestCase):
+    """Tests for the per-class shard files of FileStorage"""
+
+    settings = {'shards': 1}
+
+    def setUp(self):
+        """Saves objects of two classes to a directory sharded by class"""
+        super().setUp()
+        self.shards = os.path.join(self.tmp, 'file')
+        self.state = State(name="Ohio")
+        self.amenity = Amenity(name="Wifi")
+        for obj in (self.state, self.amenity):
+            self.storage.new(obj)
+        self.storage.save()
+
+    def stat(self, name):
+        """Returns (inode, mtime) of a shard file"""
+        st = os.stat(os.path.join(self.shards, name))
+        return st.st_ino, st.st_mtime_ns
+
+    def test_one_file_per_class(self):
+        """Test that save() writes one file per class"""
+        self.assertEqual(sorted(os.listdir(self.shards)),
+                         ["Amenity.json", "State.json"])
+        self.assertFalse(os.path.exists(os.path.join(self.tmp, 'file.json')))
+        self.storage.reload()
+        self.assertEqual(self.storage.get("State", self.state.id).name,
+                         "Ohio")
+        self.assertEqual(self.storage.count(), 2)
+
+    def test_import_reads_shards(self):
+        """Test that a new process reads the shards when importing models,
+        whose worker threads must not import from models"""
+        FileStorage._FileStorage__file_path = os.path.join(self.tmp, 'dev',
+                                                           'file.json')
+        self.storage.save()
+        root = os.path.dirname(os.path.dirname(models.__file__))
+        env = dict(os.environ, HBNB_FILE_SHARDS='1',
+                   PYTHONPATH=os.path.abspath(root))
+        env.pop('HBNB_TYPE_STORAGE', None)
+        out = subprocess.run(
+            [sys.executable, '-c',
+             "import models; print(models.storage.count())"],
+            cwd=self.tmp, env=env, timeout=20, check=True,
+            stdout=subprocess.PIPE).stdout
+        self.assertEqual(out.decode().strip(), "2")
+
+    def test_save_dirty_shards(self):
+        """Test that save() only rewrites the shards of changed objects"""
+        state = self.stat("State.json")
+        amenity = self.stat("Amenity.json")
+        self.storage.new(Amenity(name="Pool"))
+        self.storage.save()
+        self.assertEqual(self.stat("State.json"), state)
+        self.assertNotEqual(self.stat("Amenity.json"), amenity)
+        self.storage.delete(self.state)
+        self.assertEqual(os.listdir(self.shards), ["Amenity.json"])
+        self.storage.reload()
+        self.assertEqual(self.storage.count("Amenity"), 2)
+        self.assertEqual(self.storage.count("State"), 0)
+
+    def test_save_changed_object(self):
+        """Test that save() rewrites the shard of a change made without
+        new()"""
+        self.state.name = "Iowa"
+        self.storage.save()
+        self.storage.reload()
+        self.assertEqual(self.storage.get("State", self.state.id).name,
+                         "Iowa")
+
+    def test_hash_partitions(self):
+        """Test that objects are spread over several files per class"""
+        FileStorage._FileStorage__shards = 4
+        shutil.rmtree(self.shards)
+        states = [State(name=str(i)) for i in range(40)]
+        for state in states:
+            self.storage.new(state)
+        self.storage.save()
+        names = os.listdir(self.shards)
+        self.assertEqual(len([n for n in names if n.startswith("State.")]),
+                         4)
+        self.storage.reload()
+        self.assertEqual(self.storage.count("State"), 41)
+        for state in states:
+            self.assertEqual(self.storage.get(State, state.id).name,
+                             state.name)
+
+    def test_reload_single_file(self):
+        """Test that a single snapshot file is read until sharded"""
+        FileStorage._FileStorage__shards = 0
+        self.storage.save()
+        shutil.rmtree(self.shards)
+        FileStorage._FileStorage__shards = 1
+        self.storage.reload()
+        self.assertEqual(self.storage.count(), 2)
+        self.storage.new(City(name="Akron", state_id=self.state.id))
+        self.storage.save()
+        self.assertEqual(len(os.listdir(self.shards)), 3)
+
+    def test_reload_after_journal(self):
+        """Test that the journal of a single snapshot file is applied once,
+        when its objects move to the shards"""
+        FileStorage._FileStorage__shards = 0
+        FileStorage._FileStorage__journal = True
+        FileStorage._FileStorage__journal_ratio = 100.0
+        shutil.rmtree(self.shards)
+        self.storage.save()
+        self.state.name = "old"
+        self.storage.save()
+        self.assertTrue(os.path.exists(self.fname + '.log'))
+        FileStorage._FileStorage__shards = 1
+        self.storage.reload()
+        self.assertEqual(self.storage.get("State", self.state.id).name,
+                         "old")
+        state = self.storage.get("State", self.state.id)
+        state.name = "new"
+        self.storage.save()
+        self.assertFalse(os.path.exists(self.fname + '.log'))
+        self.storage.reload()
+        self.assertEqual(self.storage.get("State", self.state.id).name,
+                         "new")
+        self.storage.delete(self.storage.get("State", self.state.id))
+        self.storage.reload()
+        self.assertIsNone(self.storage.get("State", self.state.id))
+
+
+@unittest.skipIf(storage_type == 'db', 'skip if environ is db')
+class TestFileStoragePage(FileStorageTestCase):
+    """Tests for the keyset pagination of FileStorage"""
+
+    def setUp(self):
+        """Adds States of a few names"""
+        super().setUp()
+        self.states = [State(name=str(i % 3)) for i in range(7)]
+        for state in self.states:
+            self.storage.new(state)
+
+    def pages(self, **kwargs):
+        """Reads all the pages of States of 3 instances"""
+        pages, after_id = [], None
+        while True:
+            objs, after_id = self.storage.page(State, after_id, 3, **kwargs)
+            pages.append(objs)
+            if after_id is None:
+                return pages
+
+    def test_page_by_id(self):
+        """Test that pages follow the order of ids"""
+        states = sorted(self.states, key=lambda state: state.id)
+        self.assertEqual(self.pages(), [states[:3], states[3:6], states[6:]])
+        self.assertEqual(self.storage.page("City"), ([], None))
+
+    def test_page_follows_changes(self):
+        """Test that the sorted ids follow new() and delete()"""
+        self.pages()
+        self.storage.delete(self.states[0])
+        state = State(name="3")
+        self.storage.new(state)
+        states = self.states[1:] + [state]
+        self.assertEqual(sum(self.pages(), []),
+                         sorted(states, key=lambda state: state.id))
+
+    def test_page_order_by(self):
+        """Test that pages follow order_by, then ids"""
+        states = sorted(self.states, key=lambda state: (state.name,
+                                                        state.id))
+        self.assertEqual(sum(self.pages(order_by="name"), []), states)
+        with self.assertRaises(ValueError):
+            self.storage.page(State, "missing", order_by="name")
+
+    def test_page_order_by_mixed_types(self):
+        """Test that values of different types, as a PUT can set, sort None
+        first, then numbers, then texts"""
+        self.states[0].name = 5
+        self.states[1].name = None
+        states = [self.states[1], self.states[0]] + sorted(
+            self.states[2:], key=lambda state: (state.name, state.id))
+        self.assertEqual(sum(self.pages(order_by="name"), []), states)
+
+    def test_page_where(self):
+        """Test that where selects the instances of the pages"""
+        state = self.states[0]
+        cities = [City(name=str(i), state_id=state.id) for i in range(4)]
+        for city in cities + [City(name="0", state_id=self.states[1].id)]:
+            self.storage.new(city)
+        cities.sort(key=lambda city: city.id)
+        objs, after_id = self.storage.page(City, limit=3,
+                                           where={"state_id": state.id})
+        self.assertEqual((objs, after_id), (cities[:3], cities[2].id))
+        self.assertEqual(self.storage.page(City, after_id, 3,
+                                           where={"state_id": state.id}),
+                         (cities[3:], None))
+        self.assertEqual(self.storage.page(
+            City, where={"state_id": state.id, "name": "2"})[0],
+            [city for city in cities if city.name == "2"])
+
+
 if __name__ == '__main__':
     unittest.main()
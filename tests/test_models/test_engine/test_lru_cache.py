@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+"""
+Unit Test for the LRUCache Class
+"""
+import time
+import unittest
+import pep8
+from models.engine.lru_cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+    """Tests for the cache of DBStorage.get()"""
+
+    def test_pep8_conformance_lru_cache(self):
+        """Test that models/engine/lru_cache.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/lru_cache.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_get_put(self):
+        """Test that get() returns what put() stored and counts hits"""
+        cache = LRUCache(2, 60)
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        cache.pop("a")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 2, "size": 0,
+                                         "maxsize": 2})
+
+    def test_least_recently_used(self):
+        """Test that a full cache evicts the least recently used key"""
+        cache = LRUCache(2, 60)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+
+    def test_ttl(self):
+        """Test that values expire after ttl seconds"""
+        cache = LRUCache(2, 0.01)
+        cache.put("a", 1)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["size"], 0)
+        cache.put("b", 2)
+        cache.clear()
+        self.assertIsNone(cache.get("b"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/python3
+"""
+Unit Test for the snapshot module
+"""
+import unittest
+import models
+import io
+import json
+import os
+import pickle
+import struct
+from datetime import datetime
+from models.engine import snapshot
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.state import State
+from tests.test_models.test_engine.test_file_storage import \
+    FileStorageTestCase
+
+# HBNB_TYPE_STORAGE=sqlite also sets storage_t to 'db'
+storage_type = models.storage_t
+
+
+@unittest.skipIf(storage_type == 'db', 'skip if environ is db')
+class TestSnapshotBinary(unittest.TestCase):
+    """Testing the binary snapshot format"""
+
+    def setUp(self):
+        """Creates records like FileStorage writes them"""
+        self.state = State(name="Alaska")
+        self.place = Place(name="Cabin", amenity_ids=["a", "b"],
+                           latitude=61.2, number_rooms=2)
+        self.records = {}
+        for obj in (self.state, self.place):
+            key = "{}.{}".format(type(obj).__name__, obj.id)
+            self.records[key] = obj.to_json()
+
+    def test_round_trip(self):
+        """Test that load() returns what dump() wrote"""
+        f_io = io.BytesIO()
+        snapshot.dump(self.records.items(), f_io)
+        f_io.seek(0)
+        loaded = {}
+        for cls_name, keys, attrs in snapshot.load(f_io):
+            for key, d in zip(keys, attrs):
+                loaded[key] = (cls_name, d)
+        cls_name, d = loaded["Place." + self.place.id]
+        self.assertEqual(cls_name, "Place")
+        self.assertEqual(d, self.place.__dict__)
+        self.assertIsInstance(d["created_at"], datetime)
+        cls_name, d = loaded["State." + self.state.id]
+        self.assertEqual(d, self.state.__dict__)
+
+    def test_header(self):
+        """Test that load() checks the magic number and version"""
+        with self.assertRaises(ValueError):
+            list(snapshot.load(io.BytesIO(b'{"not": "binary"}')))
+        f_io = io.BytesIO()
+        snapshot.dump(self.records.items(), f_io)
+        data = bytearray(f_io.getvalue())
+        data[len(snapshot.MAGIC) + 1] = snapshot.VERSION + 1
+        with self.assertRaises(ValueError):
+            list(snapshot.load(io.BytesIO(bytes(data))))
+
+    def test_refuses_globals(self):
+        """Test that load() refuses a payload that imports anything"""
+        header = snapshot.MAGIC + struct.pack('>H', snapshot.VERSION)
+        for payload in (pickle.dumps({"State": [datetime.now()]}),
+                        pickle.dumps([])[:-1]):
+            with self.assertRaises(ValueError):
+                list(snapshot.load(io.BytesIO(header + payload)))
+
+
+@unittest.skipIf(storage_type == 'db', 'skip if environ is db')
+class TestSnapshotStorage(FileStorageTestCase):
+    """Testing FileStorage with binary snapshots, and the converter"""
+
+    def setUp(self):
+        """Adds a State to the empty storage"""
+        super().setUp()
+        self.state = State(name="Alaska")
+        self.storage.new(self.state)
+
+    def test_binary_storage(self):
+        """Test that FileStorage saves and reloads binary snapshots"""
+        FileStorage._FileStorage__format = 'binary'
+        self.storage.save()
+        self.assertTrue(os.path.isfile(os.path.join(self.tmp, 'file.hbnb')))
+        self.assertFalse(os.path.exists(self.fname))
+        self.storage.reload()
+        state = self.storage.get("State", self.state.id)
+        self.assertIsNot(state, self.state)
+        self.assertEqual(state.__dict__, self.state.__dict__)
+
+    def test_convert(self):
+        """Test converting a JSON snapshot to binary and back"""
+        self.storage.save()
+        binary = os.path.join(self.tmp, 'file.hbnb')
+        back = os.path.join(self.tmp, 'back.json')
+        self.assertEqual(snapshot.main(['', self.fname, binary]), 0)
+        self.assertEqual(snapshot.main(['', binary, back]), 0)
+        with open(self.fname, 'r') as f_json, open(back, 'r') as f_back:
+            self.assertEqual(json.load(f_json), json.load(f_back))
+        FileStorage._FileStorage__format = 'binary'
+        self.storage.reload()
+        self.assertEqual(self.storage.get("State", self.state.id).name,
+                         "Alaska")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,339 @@
+#!/usr/bin/python3
+"""
+Unit Test for SQLiteStorage Class
+"""
+import unittest
+import models
+from models.engine.sqlite_storage import SQLiteStorage
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+import os
+import pep8
+import shutil
+import tempfile
+from sqlalchemy import event, inspect, text
+
+storage_type = os.environ.get('HBNB_TYPE_STORAGE')
+
+
+class TestSQLiteStorageDocs(unittest.TestCase):
+    """Class for testing documentation and style of SQLiteStorage"""
+
+    def test_pep8_conformance_sqlite_storage(self):
+        """Test that models/engine/sqlite_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/sqlite_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_doc_class(self):
+        """Test documentation for SQLiteStorage class"""
+        self.assertIsNot(SQLiteStorage.__doc__, None)
+        self.assertIsNot(SQLiteStorage.new_engine.__doc__, None)
+
+
+@unittest.skipIf(storage_type != 'sqlite', 'skip if environ is not sqlite')
+class TestSQLiteStorage(unittest.TestCase):
+    """Test the SQLite storage engine"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Points models.storage to an empty temporary database"""
+        cls.tmp = tempfile.mkdtemp()
+        cls.path = SQLiteStorage._SQLiteStorage__file_path
+        SQLiteStorage._SQLiteStorage__file_path = os.path.join(cls.tmp,
+                                                               'hbnb.db')
+        cls.models_storage = models.storage
+        models.storage = SQLiteStorage()
+        models.storage.reload()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Restores models.storage and the database path"""
+        models.storage.close()
+        models.storage._DBStorage__engine.dispose()
+        models.storage = cls.models_storage
+        SQLiteStorage._SQLiteStorage__file_path = cls.path
+        shutil.rmtree(cls.tmp)
+
+    def setUp(self):
+        """Saves a State and one of its cities"""
+        self.storage = models.storage
+        self.state = State(name="Oregon")
+        self.state.save()
+        self.city = City(name="Salem", state_id=self.state.id)
+        self.city.save()
+
+    def tearDown(self):
+        """Deletes the saved objects"""
+        self.storage.delete(self.city)
+        self.storage.delete(self.state)
+        self.storage.save()
+
+    def test_storage(self):
+        """Test that models.storage is an SQLiteStorage"""
+        self.assertIsInstance(self.storage, SQLiteStorage)
+
+    def test_get_count(self):
+        """Test get() and count()"""
+        self.assertIs(self.storage.get("State", self.state.id), self.state)
+        count = self.storage.count("City")
+        city = City(name="Eugene", state_id=self.state.id)
+        city.save()
+        self.assertEqual(self.storage.count("City"), count + 1)
+        self.assertEqual([c.name for c in self.state.cities
+                          if c is not self.city], ["Eugene"])
+        self.storage.delete(city)
+        self.storage.save()
+        # drop the session, where self.state.cities still holds the deleted
+        # city that the cascade of tearDown would delete again
+        state_id, city_id = self.state.id, self.city.id
+        self.storage.close()
+        self.state = self.storage.get("State", state_id)
+        self.city = self.storage.get("City", city_id)
+
+    def test_counts(self):
+        """Test that counts() follows new(), delete() and cascades"""
+        counts = self.storage.counts()
+        self.assertNotIn("BaseModel", counts)
+        self.assertEqual(counts["State"], self.storage.count("State"))
+        user = User(email="a@b.c", password="pwd")
+        user.save()
+        place = Place(name="Home", city_id=self.city.id, user_id=user.id)
+        self.storage.new(place)
+        self.assertEqual(self.storage.counts()["Place"], counts["Place"] + 1)
+        self.storage.delete(user)
+        self.storage.save()
+        self.assertEqual(self.storage.counts(), counts)
+
+    def test_counts_close(self):
+        """Test that counts() reads again the rows written by another storage
+        once the session is closed"""
+        counts = self.storage.counts()
+        storage = SQLiteStorage()
+        storage.reload()
+        state = State(name="Nevada")
+        storage.new(state)
+        storage.save()
+        self.assertEqual(self.storage.count("State"), counts["State"])
+        self.storage.close()
+        self.assertEqual(self.storage.count("State"), counts["State"] + 1)
+        storage.delete(storage.get("State", state.id))
+        storage.save()
+        storage.close()
+        storage._DBStorage__engine.dispose()
+        self.storage.close()
+        self.assertEqual(self.storage.count("State"), counts["State"])
+
+    def test_eager_load(self):
+        """Test that load= reads the relationships with the parents"""
+        queries = []
+        engine = self.storage._DBStorage__engine
+
+        def count_query(*args):
+            """Counts the queries sent to the database"""
+            queries.append(args[2])
+        event.listen(engine, "before_cursor_execute", count_query)
+        try:
+            for strategy, count in (("selectin", 2), ("joined", 1)):
+                self.storage.close()
+                del queries[:]
+                states = self.storage.all("State", load=("cities",),
+                                          strategy=strategy)
+                cities = [city.id for state in states.values()
+                          for city in state.cities]
+                self.assertIn(self.city.id, cities)
+                self.assertEqual(len(queries), count)
+            self.storage.close()
+            del queries[:]
+            state = self.storage.get("State", self.state.id,
+                                     load=("cities.places",))
+            self.assertEqual([city.places for city in state.cities], [[]])
+            self.assertEqual(len(queries), 3)
+        finally:
+            event.remove(engine, "before_cursor_execute", count_query)
+
+    def test_page(self):
+        """Test that page() reads a class in order, one page at a time"""
+        cities = [self.city] + [City(name=str(i % 2), state_id=self.state.id)
+                                for i in range(4)]
+        for city in cities[1:]:
+            self.storage.new(city)
+        self.storage.save()
+        try:
+            for order_by in ("id", "name"):
+                found, after_id = [], None
+                while True:
+                    objs, after_id = self.storage.page(
+                        City, after_id, 2, order_by=order_by,
+                        where={"state_id": self.state.id})
+                    found += objs
+                    if after_id is None:
+                        break
+                expected = sorted(cities, key=lambda city: (
+                    getattr(city, order_by), city.id))
+                self.assertEqual(found, expected)
+            objs, after_id = self.storage.page(
+                City, where={"state_id": self.state.id, "name": "1"})
+            self.assertEqual(sorted(city.id for city in objs),
+                             sorted(city.id for city in cities
+                                    if city.name == "1"))
+        finally:
+            for city in cities[1:]:
+                self.storage.delete(city)
+
+    def test_iter_all(self):
+        """Test that iter_all() streams the same objects as all()"""
+        for batch_size in (1, 1000):
+            self.assertEqual(
+                [obj.id for obj in self.storage.iter_all("City",
+                                                         batch_size)],
+                [obj.id for obj in self.storage.all("City").values()])
+        self.assertEqual(len(list(self.storage.iter_all())),
+                         self.storage.count())
+
+    def test_bulk(self):
+        """Test that bulk_new() and bulk_update() commit all objects"""
+        cities = [City(name=str(i), state_id=self.state.id)
+                  for i in range(3)]
+        ids = [city.id for city in cities]
+        state_id, city_id = self.state.id, self.city.id
+        count = self.storage.count("City")
+        self.storage.bulk_new(cities)
+        try:
+            self.assertEqual(self.storage.count("City"), count + 3)
+            rows = [{"id": bulk_id, "name": "Bend"} for bulk_id in ids[:2]]
+            self.assertEqual(self.storage.bulk_update("City", rows), 2)
+            self.assertEqual(cities[0].name, "Bend")
+            with self.assertRaises(ValueError):
+                self.storage.bulk_update(City, [{"id": "missing"}])
+            self.storage.close()
+            names = sorted(self.storage.get("City", bulk_id).name
+                           for bulk_id in ids)
+            self.assertEqual(names, ["2", "Bend", "Bend"])
+        finally:
+            self.storage.close()
+            for bulk_id in ids:
+                self.storage.delete(self.storage.get("City", bulk_id))
+            self.storage.save()
+            self.state = self.storage.get("State", state_id)
+            self.city = self.storage.get("City", city_id)
+
+    def test_get_cache(self):
+        """Test that get() reads cached objects until they are written"""
+        storage = SQLiteStorage()
+        storage._DBStorage__cache_size = 10
+        storage.reload()
+        self.assertIsNone(self.storage.cache_stats())
+        self.assertIsNone(storage.get("City", "missing"))
+        city = storage.get("City", self.city.id)
+        storage.close()
+        cached = storage.get(City, self.city.id)
+        self.assertIsNot(cached, city)
+        self.assertEqual(cached.name, "Salem")
+        self.assertEqual(cached.state.id, self.state.id)
+        self.assertEqual(storage.cache_stats()["hits"], 1)
+        cached.name = "Portland"
+        storage.save()
+        storage.close()
+        self.assertEqual(storage.get("City", self.city.id).name, "Portland")
+        storage.delete(storage.get("City", self.city.id))
+        storage.save()
+        storage.close()
+        self.assertIsNone(storage.get("City", self.city.id))
+        self.assertEqual(storage.cache_stats(), {"hits": 2, "misses": 4,
+                                                 "size": 0, "maxsize": 10})
+        # models.storage drops its session, which holds the deleted city
+        state_id = self.state.id
+        self.storage.close()
+        self.state = self.storage.get("State", state_id)
+        self.city = City(name="Salem", state_id=state_id)
+        self.city.save()
+
+    def explain(self, *args, **kwargs):
+        """Returns the query plan of the query sent by page()"""
+        statements = []
+        engine = self.storage._DBStorage__engine
+
+        def capture(conn, cursor, statement, parameters, *args):
+            """Records the queries sent to the database"""
+            statements.append((statement, parameters))
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            self.storage.page(*args, **kwargs)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        statement, parameters = statements[-1]
+        with engine.connect() as connection:
+            plan = connection.exec_driver_sql(
+                "EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+        return "\n".join(row[-1] for row in plan)
+
+    def test_explain(self):
+        """Test that the queries of the API use the indexes"""
+        for args, index in (
+                (("City", None, 10, "name", {"state_id": "x"}),
+                 "ix_cities_state_id_name"),
+                (("Place", None, 10, "id", {"city_id": "x"}),
+                 "ix_places_city_id"),
+                (("Review", None, 10, "created_at", {"place_id": "x"}),
+                 "ix_reviews_place_id_created_at"),
+                (("User", None, 10, "id", {"email": "x"}),
+                 "ix_users_email")):
+            plan = self.explain(*args)
+            self.assertIn("USING INDEX " + index, plan)
+            if args[3] != "id":
+                self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_reload(self):
+        """Test that objects are read back from the database file"""
+        self.storage.close()
+        state = self.storage.get("State", self.state.id)
+        self.assertIsNot(state, self.state)
+        self.assertEqual(state.name, "Oregon")
+        self.assertEqual([city.id for city in state.cities], [self.city.id])
+
+    def test_wal_mode(self):
+        """Test that connections use write-ahead logging"""
+        engine = self.storage._DBStorage__engine
+        with engine.connect() as connection:
+            mode = connection.execute(text("PRAGMA journal_mode")).scalar()
+        self.assertEqual(mode, "wal")
+
+    def test_indexes(self):
+        """Test that the foreign keys lead an index"""
+        inspector = inspect(self.storage._DBStorage__engine)
+        for table, column in (("cities", "state_id"), ("places", "city_id"),
+                              ("places", "user_id"), ("reviews", "place_id"),
+                              ("reviews", "user_id")):
+            indexed = [index["column_names"][0]
+                       for index in inspector.get_indexes(table)]
+            self.assertIn(column, indexed)
+
+    def test_engine_options(self):
+        """Test that the pool settings are read from the environment"""
+        variables = {'HBNB_DB_POOL_SIZE': '20', 'HBNB_DB_POOL_PRE_PING': '1',
+                     'HBNB_DB_ISOLATION_LEVEL': 'SERIALIZABLE'}
+        os.environ.update(variables)
+        try:
+            options = self.storage.engine_options()
+        finally:
+            for variable in variables:
+                del os.environ[variable]
+        self.assertEqual(options, {'pool_size': 20, 'pool_pre_ping': True,
+                                   'isolation_level': 'SERIALIZABLE'})
+        self.assertEqual(self.storage.engine_options(), {})
+
+    def test_pool_stats(self):
+        """Test the statistics of the connection pool"""
+        stats = self.storage.pool_stats()
+        self.assertIn('status', stats)
+        self.assertEqual(stats['size'], 5)
+        self.assertEqual(stats['checkedin'] + stats['checkedout'],
+                         stats['size'] + stats['overflow'])
+
+
+if __name__ == '__main__':
+    unittest.main()